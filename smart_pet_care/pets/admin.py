@@ -1,10 +1,23 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.db import transaction
+from . import catalog_cache, search
 from .models import Pet, Adoption, Reminder, ChatbotQuery, UserProfile
 
 # ============================================
 # PET ADMIN
 # ============================================
 
+class SearchRankChangeList(ChangeList):
+    """
+    Best match first while searching, a clicked column still wins
+    """
+    def get_ordering(self, request, queryset):
+        if self.query and ORDER_VAR not in self.params:
+            return ['search_rank', '-pk']
+        return super().get_ordering(request, queryset)
+
+
 @admin.register(Pet)
 class PetAdmin(admin.ModelAdmin):
     list_display = ['name', 'breed', 'pet_type', 'age', 'status', 'added_date']
@@ -12,6 +25,18 @@ class PetAdmin(admin.ModelAdmin):
     search_fields = ['name', 'breed', 'description']
     list_editable = ['status']
     ordering = ['-added_date']
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Full-text index instead of icontains over every row. Every
+        match is listed, the changelist pages through them.
+        """
+        if not search_term:
+            return queryset, False
+        return search.matches(queryset, search_term), False
+
+    def get_changelist(self, request, **kwargs):
+        return SearchRankChangeList
     
     fieldsets = (
         ('Basic Information', {
@@ -38,6 +63,30 @@ class AdoptionAdmin(admin.ModelAdmin):
     list_editable = ['status']
     ordering = ['-request_date']
     readonly_fields = ['request_date']
+    actions = ['approve_selected', 'reject_selected']
+
+    @admin.action(description='Approve selected requests (one per pet)')
+    def approve_selected(self, request, queryset):
+        """
+        Set-based approval: competing requests are rejected and the pets
+        marked adopted without a save() per row
+        """
+        with transaction.atomic():
+            approved, rejected, pet_types = queryset.approve()
+            if pet_types:
+                # update() skips the Pet signals that normally do this
+                transaction.on_commit(lambda: catalog_cache.invalidate(*pet_types))
+
+        self.message_user(
+            request,
+            f'Approved {approved} requests, auto-rejected {rejected} competing requests.',
+            messages.SUCCESS,
+        )
+
+    @admin.action(description='Reject selected pending requests')
+    def reject_selected(self, request, queryset):
+        rejected = queryset.reject()
+        self.message_user(request, f'Rejected {rejected} requests.', messages.SUCCESS)
 
 
 # ============================================
@@ -50,14 +99,17 @@ class ReminderAdmin(admin.ModelAdmin):
     list_filter = ['reminder_type', 'is_completed', 'is_recurring', 'reminder_date']
     search_fields = ['title', 'user__username', 'pet__name']
     list_editable = ['is_completed']
-    ordering = ['reminder_date', 'reminder_time']
+    ordering = ['due_at']
     
     fieldsets = (
         ('Reminder Information', {
             'fields': ('user', 'pet', 'title', 'description', 'reminder_type')
         }),
         ('Schedule', {
-            'fields': ('reminder_date', 'reminder_time', 'is_recurring')
+            'fields': ('reminder_date', 'reminder_time')
+        }),
+        ('Recurrence', {
+            'fields': ('recurrence_frequency', 'recurrence_interval', 'recurrence_until', 'recurrence_count')
         }),
         ('Status', {
             'fields': ('is_completed',)
@@ -0,0 +1,136 @@
+"""
+Read-only JSON catalog of pets for the mobile app.
+
+- GET /api/pets/         available pets, newest first, keyset pages
+                         (?after= / ?before= cursors, same as /pets/)
+- GET /api/pets/<id>/    one pet
+
+Both accept ?fields=name,breed,... to return (and SELECT) only those
+columns, and ?type= on the list.
+
+Responses carry a strong ETag derived from the catalog cache version
+(see catalog_cache.py) and the query string, so it is computed without
+touching the database. A matching If-None-Match gets a 304 before any
+query or serialization runs.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from . import catalog_cache
+from .models import Pet
+from .pagination import keyset_paginate
+from .serializers import PetSerializer
+
+ALL_FIELDS = PetSerializer.Meta.fields
+PET_TYPES = {value for value, label in Pet.PET_TYPES}
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def _requested_fields(request):
+    """
+    Field names from ?fields=, or all of them
+    """
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(ALL_FIELDS)
+
+    fields = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = sorted(set(fields) - set(ALL_FIELDS))
+    if unknown:
+        raise InvalidFields(unknown)
+    return fields
+
+
+def _columns(fields):
+    # Keyset pagination needs added_date and id whatever is returned
+    return sorted({*fields, 'id', 'added_date'})
+
+
+def _page_size(request):
+    try:
+        size = int(request.GET.get('page_size', settings.API_PAGE_SIZE))
+    except ValueError:
+        size = settings.API_PAGE_SIZE
+    return max(1, min(size, settings.API_MAX_PAGE_SIZE))
+
+
+def _pet_type(request):
+    """
+    ?type= when it is a known pet type, "all" when it is missing, None
+    when it is unknown (and matches no pet)
+    """
+    pet_type = request.GET.get('type') or catalog_cache.ALL_TYPES
+    if pet_type == catalog_cache.ALL_TYPES or pet_type in PET_TYPES:
+        return pet_type
+    return None
+
+
+def _catalog_etag(request, *args, **kwargs):
+    """
+    Strong validator: the catalog version of the requested pet type
+    plus the full query string. Any Pet save / delete bumps it.
+    """
+    # Only known types reach the cache, client input must not add keys
+    pet_type = _pet_type(request) if 'pet_id' not in kwargs else None
+    version = catalog_cache.get_version(pet_type or catalog_cache.ALL_TYPES)
+    key = f"{version}|{request.path}|{sorted(request.GET.lists())}"
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def _invalid_fields_response(error):
+    return Response(
+        {'error': f"Unknown fields: {', '.join(error.args[0])}", 'fields': ALL_FIELDS},
+        status=400,
+    )
+
+
+@condition(etag_func=_catalog_etag)
+@api_view(['GET'])
+def pet_catalog(request):
+    try:
+        fields = _requested_fields(request)
+    except InvalidFields as error:
+        return _invalid_fields_response(error)
+
+    pets = Pet.objects.filter(status='available').only(*_columns(fields))
+    pet_type = _pet_type(request)
+    if pet_type is None:
+        pets = pets.none()
+    elif pet_type != catalog_cache.ALL_TYPES:
+        pets = pets.filter(pet_type=pet_type)
+
+    page = keyset_paginate(
+        pets,
+        _page_size(request),
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
+
+    url = remove_query_param(remove_query_param(request.build_absolute_uri(), 'after'), 'before')
+    return Response({
+        'results': PetSerializer(page.object_list, many=True, fields=fields, context={'request': request}).data,
+        'next': replace_query_param(url, 'after', page.next_cursor) if page.has_next else None,
+        'previous': replace_query_param(url, 'before', page.previous_cursor) if page.has_previous else None,
+    })
+
+
+@condition(etag_func=_catalog_etag)
+@api_view(['GET'])
+def pet_detail(request, pet_id):
+    try:
+        fields = _requested_fields(request)
+    except InvalidFields as error:
+        return _invalid_fields_response(error)
+
+    pet = get_object_or_404(Pet.objects.only(*_columns(fields)), pk=pet_id)
+    return Response(PetSerializer(pet, fields=fields, context={'request': request}).data)
@@ -6,4 +6,5 @@ class PetsConfig(AppConfig):
     name = 'pets'
 
     def ready(self):
+        import pets.checks
         import pets.signals
@@ -0,0 +1,107 @@
+"""
+Cache of the rendered pet catalog grid.
+
+Each pet_type has a version token in the cache and every rendered grid
+is stored under a key that includes the token. Saving or deleting a Pet
+(including the save done when an adoption is approved) replaces the
+token of its type and of "all", so older renders can no longer be
+reached and are left to expire. The time of that change is kept too,
+as the Last-Modified of catalog pages.
+
+The versions live in the default cache, so processes only see each
+other's invalidations when CACHES points at a shared backend.
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+
+ALL_TYPES = 'all'
+
+_lock = threading.Lock()
+_started = time.time()
+_counters = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+def _version_key(pet_type):
+    return f'catalog:version:{pet_type}'
+
+
+def _changed_key(pet_type):
+    return f'catalog:changed:{pet_type}'
+
+
+def _count(name):
+    with _lock:
+        _counters[name] += 1
+
+
+def get_version(pet_type):
+    version = cache.get(_version_key(pet_type))
+    if version is None:
+        # Evicted or never set: a fresh token can't match older renders
+        version = uuid.uuid4().hex
+        cache.add(_version_key(pet_type), version, None)
+        version = cache.get(_version_key(pet_type), version)
+    return version
+
+
+def invalidate(*pet_types):
+    """
+    Make every cached grid of these pet types (and "all") unreachable
+    """
+    now = time.time()
+    for pet_type in {*pet_types, ALL_TYPES}:
+        cache.set(_version_key(pet_type), uuid.uuid4().hex, None)
+        cache.set(_changed_key(pet_type), now, None)
+        _count('invalidations')
+
+
+def last_changed(pet_type):
+    """
+    When pets of pet_type last changed, as an aware datetime. Creating a
+    pet stamps it too, so it is never older than the newest added_date.
+    Without a stamp (evicted, cache emptied by a restart) the process
+    start time is used, which is later than any change it could miss.
+    """
+    changed = cache.get(_changed_key(pet_type))
+    if changed is None:
+        cache.add(_changed_key(pet_type), _started, None)
+        changed = cache.get(_changed_key(pet_type), _started)
+    return datetime.fromtimestamp(changed, timezone.utc)
+
+
+def get_or_render(pet_type, variant, render):
+    """
+    Cached grid for pet_type. `variant` holds whatever else changes the
+    output (cursor, login state); `render` builds the HTML on a miss.
+    """
+    pet_type = pet_type or ALL_TYPES
+    digest = hashlib.md5(repr(variant).encode()).hexdigest()
+    key = f'catalog:grid:{pet_type}:{get_version(pet_type)}:{digest}'
+
+    html = cache.get(key)
+    if html is not None:
+        _count('hits')
+        return html
+
+    _count('misses')
+    html = render()
+    cache.set(key, html, settings.CATALOG_CACHE_TIMEOUT)
+    return html
+
+
+def stats():
+    """
+    Counters for this process: hits, misses, invalidations, hit_rate
+    """
+    with _lock:
+        stats = dict(_counters)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+    return stats
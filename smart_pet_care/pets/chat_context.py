@@ -0,0 +1,93 @@
+"""
+Recent turns of each chat conversation, kept in process memory.
+
+A follow-up such as "what about vaccines?" names no pet, so the chatbot
+takes the pet type from the same conversation's last turns instead of
+reading ChatbotQuery rows back. Every conversation (the chat session_id)
+keeps a ring buffer of its last CHATBOT_CONTEXT_TURNS (pet_type, intent)
+pairs. Conversations idle for CHATBOT_CONTEXT_TTL seconds are dropped,
+and past CHATBOT_CONTEXT_MAX_SESSIONS the least recently active one
+goes. Five turns take a little over 1 KB per conversation.
+
+The context is per process: with several workers, a follow-up served by
+another worker is answered without it, as before.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+
+from django.conf import settings
+
+
+class ChatContextStore:
+    """
+    session_id -> ring buffer of recent (pet_type, intent) turns, with
+    TTL expiry and a cap on the number of sessions
+    """
+
+    def __init__(self, max_sessions=None, turns=None, ttl=None, clock=time.monotonic):
+        self.max_sessions = max_sessions or settings.CHATBOT_CONTEXT_MAX_SESSIONS
+        self.turns = turns or settings.CHATBOT_CONTEXT_TURNS
+        self.ttl = ttl or settings.CHATBOT_CONTEXT_TTL
+        self._clock = clock
+        # Least recently active first, so expired sessions are at the front
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'expired': 0, 'evicted': 0}
+
+    def _expire(self, now):
+        while self._sessions:
+            session_id, (last_seen, _) = next(iter(self._sessions.items()))
+            if now - last_seen < self.ttl:
+                return
+            del self._sessions[session_id]
+            self._counters['expired'] += 1
+
+    def recent(self, session_id):
+        """
+        The session's turns, oldest first, [] once it has expired
+        """
+        with self._lock:
+            self._expire(self._clock())
+            entry = self._sessions.get(session_id)
+            return list(entry[1]) if entry else []
+
+    def last_pet_type(self, session_id):
+        """
+        The pet type most recently talked about in the session, or None
+        """
+        for pet_type, _ in reversed(self.recent(session_id)):
+            if pet_type != 'default':
+                return pet_type
+        return None
+
+    def remember(self, session_id, pet_type, intent):
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+
+            entry = self._sessions.pop(session_id, None)
+            turns = entry[1] if entry else deque(maxlen=self.turns)
+            turns.append((pet_type, intent))
+            self._sessions[session_id] = (now, turns)
+
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self._counters['evicted'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['sessions'] = len(self._sessions)
+        return stats
+
+
+store = ChatContextStore()
+
+
+def stats():
+    """
+    Counters: sessions, expired, evicted
+    """
+    return store.stats()
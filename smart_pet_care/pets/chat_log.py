@@ -0,0 +1,231 @@
+"""
+Write-behind logging for chatbot conversations.
+
+Chat views hand their ChatbotQuery rows to ``log_chats`` and reply
+straight away. A background thread collects the rows and saves them
+with ``bulk_create`` once CHATBOT_LOG_BATCH_SIZE rows are waiting or
+CHATBOT_LOG_FLUSH_INTERVAL seconds have passed, whichever comes first.
+
+Set CHATBOT_LOG_WRITE_BEHIND = False to save synchronously instead.
+
+Old conversations are removed by ``prune_history`` (run through the
+prune_chat_history management command), a bounded chunk at a time.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+from .models import ChatbotQuery
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class ChatLogBuffer:
+    """
+    In-process queue of unsaved ChatbotQuery rows with a flusher thread
+    """
+
+    def __init__(self):
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._counters = {
+            'enqueued': 0,
+            'written': 0,
+            'dropped': 0,
+            'flushes': 0,
+        }
+
+    # ---------------- PRODUCER SIDE ----------------
+
+    def put(self, records):
+        """
+        Queue rows for saving. Rows that do not fit are dropped and
+        counted, the caller is never blocked.
+        """
+        self._ensure_running()
+
+        for record in records:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self._count('dropped')
+            else:
+                self._count('enqueued')
+
+    def flush(self, timeout=None):
+        """
+        Block until every row queued so far has been written
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return True
+
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=5):
+        """
+        Write what is left and stop the flusher thread
+        """
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+
+        if thread is None or not thread.is_alive():
+            return
+
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        stats['queue_depth'] = self._queue.qsize() if self._queue else 0
+        return stats
+
+    # ---------------- FLUSHER SIDE ----------------
+
+    def _ensure_running(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            if self._queue is None:
+                self._queue = queue.Queue(maxsize=settings.CHATBOT_LOG_MAX_QUEUE)
+            self._thread = threading.Thread(
+                target=self._run,
+                name='chat-log-writer',
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                batch, markers, stop = self._collect()
+                self._write(batch)
+                for marker in markers:
+                    marker.set()
+                if stop:
+                    return
+        finally:
+            connections.close_all()
+
+    def _collect(self):
+        """
+        Wait for the first row, then keep collecting until the batch
+        is full, the flush interval runs out, or a flush is requested
+        """
+        batch, markers = [], []
+        item = self._queue.get()
+        deadline = time.monotonic() + settings.CHATBOT_LOG_FLUSH_INTERVAL
+
+        while True:
+            if item is _STOP:
+                # Take whatever is still queued before stopping
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        return batch, markers, True
+                    if isinstance(item, threading.Event):
+                        markers.append(item)
+                    elif item is not _STOP:
+                        batch.append(item)
+
+            if isinstance(item, threading.Event):
+                markers.append(item)
+                return batch, markers, False
+
+            batch.append(item)
+            if len(batch) >= settings.CHATBOT_LOG_BATCH_SIZE:
+                return batch, markers, False
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return batch, markers, False
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return batch, markers, False
+
+    def _write(self, batch):
+        if not batch:
+            return
+
+        try:
+            ChatbotQuery.objects.bulk_create(batch)
+        except DatabaseError:
+            logger.exception("Dropped %d chatbot log rows", len(batch))
+            self._count('dropped', len(batch))
+        else:
+            self._count('written', len(batch))
+            self._count('flushes')
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+
+buffer = ChatLogBuffer()
+atexit.register(buffer.close)
+
+
+def log_chats(records):
+    """
+    Save ChatbotQuery rows, behind the response when write-behind is on
+    """
+    if settings.CHATBOT_LOG_WRITE_BEHIND:
+        buffer.put(records)
+    else:
+        ChatbotQuery.objects.bulk_create(records)
+
+
+def log_chat(**fields):
+    log_chats([ChatbotQuery(**fields)])
+
+
+def stats():
+    """
+    Counters: queue_depth, enqueued, written, dropped, flushes
+    """
+    return buffer.stats()
+
+
+def prune_history(retention_days=None, batch_size=None, sleep=0):
+    """
+    Delete chats older than the retention period in chunks of
+    batch_size rows, so no single DELETE holds the write lock for
+    long. Returns the number of rows deleted.
+    """
+    if retention_days is None:
+        retention_days = settings.CHATBOT_HISTORY_RETENTION_DAYS
+    if batch_size is None:
+        batch_size = settings.CHATBOT_PRUNE_BATCH_SIZE
+
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    expired = ChatbotQuery.objects.filter(timestamp__lt=cutoff).order_by()
+    deleted = 0
+
+    while True:
+        ids = list(expired.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+
+        deleted += ChatbotQuery.objects.filter(pk__in=ids).delete()[0]
+        if sleep:
+            time.sleep(sleep)
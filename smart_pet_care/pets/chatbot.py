@@ -1,245 +1,528 @@
+"""
+Keyword chatbot for pet care questions.
+
+The pet types, intents, keywords and replies live in
+CHATBOT_INTENTS_FILE (pets/data/chatbot_intents.json), so content edits
+need no deploy. KeywordMatcher turns them into plain dictionaries that
+are saved with marshal to CHATBOT_MATCHER_CACHE_DIR under the SHA-256
+of the file, so a worker starting on known content loads the matcher
+instead of building it. Each worker checks the file for edits every
+CHATBOT_INTENTS_RELOAD_SECONDS and swaps the new tables in.
+"""
+
+import hashlib
+import json
+import logging
+import marshal
+import os
 import random
 import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
 
-# =========================================================
-# PET TYPE DETECTION
-# =========================================================
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
-PET_TYPES = {
-    "dog": ["dog", "dogs", "puppy", "puppies"],
-    "cat": ["cat", "cats", "kitten", "kittens"],
-    "bird": ["bird", "birds", "parrot", "sparrow", "cockatiel"],
-    "rabbit": ["rabbit", "rabbits", "bunny", "bunnies"]
-}
+from . import chat_context
+from .fuzzy import FuzzyVocabulary
+
+logger = logging.getLogger(__name__)
+
+# Loaded from CHATBOT_INTENTS_FILE by load_intents() at the end of the module
+PET_TYPES = {}
+INTENTS = {}
+KNOWN_WORDS = []
 
 
 def detect_pet_type(message: str) -> str:
-    for pet, keywords in PET_TYPES.items():
-        for word in keywords:
-            if re.search(rf"\b{word}\b", message):
-                return pet
-    return "default"
+    return classify_message(message)[0]
 
 
 # =========================================================
-# INTENTS (ADVANCED & COMPLETE)
+# KEYWORD MATCHER
 # =========================================================
 
-INTENTS = {
-
-    # ---------------- GREETINGS ----------------
-    "greeting": {
-        "patterns": [
-            "hi", "hello", "hey", "good morning", "good evening"
-        ],
-        "responses": {
-            "default": [
-                "👋 Hello! I'm your AI Pet Care Assistant.",
-                "Hi there! 🐾 How can I help you with your pet today?",
-                "Hey! 😊 Ask me anything about pet care."
-            ]
-        }
-    },
-
-    # ---------------- THANKS ----------------
-    "thanks": {
-        "patterns": [
-            "thanks", "thank you", "thx", "appreciate"
-        ],
-        "responses": {
-            "default": [
-                "You're welcome! 😊",
-                "Happy to help 🐶🐱",
-                "Anytime! Let me know if you need more help."
-            ]
-        }
-    },
-
-    # ---------------- GOODBYE ----------------
-    "goodbye": {
-        "patterns": [
-            "bye", "goodbye", "see you", "exit"
-        ],
-        "responses": {
-            "default": [
-                "Goodbye! 👋 Take good care of your pet 🐾",
-                "See you soon! 😊",
-                "Bye! Come back anytime."
-            ]
-        }
-    },
-
-    # ---------------- FOOD ----------------
-    "food": {
-        "patterns": [
-            "food", "diet", "feed", "feeding", "eat", "eating", "nutrition"
-        ],
-        "responses": {
-            "dog": [
-                "Dogs need a balanced diet with protein, carbs, and healthy fats.",
-                "Avoid chocolate, grapes, onions, and spicy food for dogs.",
-                "Feed adult dogs twice a day with quality dog food."
-            ],
-            "cat": [
-                "Cats require high-protein diets and taurine-rich food.",
-                "Avoid giving milk regularly to cats.",
-                "Cats should always have access to fresh water."
-            ],
-            "bird": [
-                "Birds need seeds, fruits, vegetables, and fresh water daily.",
-                "Avoid avocado and chocolate — they are toxic to birds."
-            ],
-            "rabbit": [
-                "Rabbits should eat hay daily along with fresh vegetables.",
-                "Avoid sugary foods and processed treats."
-            ],
-            "default": [
-                "Provide species-appropriate food and clean water.",
-                "Consult a veterinarian for a proper diet plan."
-            ]
-        }
-    },
-
-    # ---------------- HEALTH ----------------
-    "health": {
-        "patterns": [
-            "health", "sick", "ill", "vomit", "fever", "pain", "injured", "disease"
-        ],
-        "responses": {
-            "dog": [
-                "If a dog is lethargic or vomiting, consult a vet immediately.",
-                "Regular deworming and checkups keep dogs healthy."
-            ],
-            "cat": [
-                "Cats hide illness well. Appetite loss is a serious sign.",
-                "Regular vaccinations help prevent feline diseases."
-            ],
-            "bird": [
-                "Fluffed feathers or inactivity can signal illness in birds.",
-                "Birds are sensitive — seek an avian vet quickly."
-            ],
-            "rabbit": [
-                "Rabbits stop eating when sick — this is an emergency.",
-                "Gut health is critical for rabbits."
-            ],
-            "default": [
-                "If your pet shows unusual symptoms, consult a veterinarian.",
-                "Early diagnosis prevents serious health issues."
-            ]
-        }
-    },
-
-    # ---------------- GROOMING ----------------
-    "grooming": {
-        "patterns": [
-            "groom", "grooming", "bath", "wash", "fur", "hair", "clean"
-        ],
-        "responses": {
-            "dog": [
-                "Dogs should be bathed every 2–4 weeks depending on breed.",
-                "Regular brushing reduces shedding and skin problems."
-            ],
-            "cat": [
-                "Cats groom themselves but still need brushing.",
-                "Long-haired cats require frequent grooming."
-            ],
-            "bird": [
-                "Birds groom naturally but need clean environments.",
-                "Provide shallow water so birds can bathe themselves."
-            ],
-            "rabbit": [
-                "Brush rabbits regularly to prevent hairballs.",
-                "Never bathe rabbits — it causes stress."
-            ],
-            "default": [
-                "Regular grooming keeps pets healthy and comfortable."
-            ]
-        }
-    },
-
-    # ---------------- VACCINATION ----------------
-    "vaccination": {
-        "patterns": [
-            "vaccine", "vaccines", "vaccination",
-            "vaccinate", "vaccinated",
-            "shot", "shots",
-            "immunization", "immunize"
-        ],
-        "responses": {
-            "dog": [
-                "Dogs need vaccines like rabies, distemper, and parvovirus.",
-                "Puppies usually start vaccinations at 6–8 weeks."
-            ],
-            "cat": [
-                "Cats need core vaccines like FVRCP and rabies.",
-                "Vaccination protects cats from deadly viruses."
-            ],
-            "bird": [
-                "Some birds require vaccinations depending on species.",
-                "Consult an avian vet before vaccinating birds."
-            ],
-            "rabbit": [
-                "Rabbits need vaccines against viral hemorrhagic disease.",
-                "Vaccination is essential for rabbit survival."
-            ],
-            "default": [
-                "Vaccinations protect pets from dangerous diseases.",
-                "A veterinarian can recommend a proper vaccine schedule."
-            ]
-        }
-    },
-
-    # ---------------- ADOPTION ----------------
-    "adoption": {
-        "patterns": [
-            "adopt", "adoption", "adopting"
-        ],
-        "responses": {
-            "default": [
-                "Adopting a pet is a wonderful responsibility ❤️",
-                "Check the adoption section to find a pet in need."
-            ]
-        }
-    },
-
-    # ---------------- EMERGENCY ----------------
-    "emergency": {
-        "patterns": [
-            "emergency", "bleeding", "accident", "injury", "unconscious"
-        ],
-        "responses": {
-            "default": [
-                "🚨 This is an emergency. Please contact a veterinarian immediately.",
-                "Urgent care is required — do not delay veterinary help."
-            ]
+_WORD = re.compile(r"\w+")
+
+# Words and single punctuation marks, the units keywords are matched in
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+# Words of one message looked up for typos, bounding the worst case
+MAX_FUZZY_WORDS = 12
+
+# What a keyword found only through a typo counts, against 1 for an exact match
+FUZZY_WEIGHT = 0.75
+
+
+def _tokens(text: str) -> tuple:
+    return tuple(_TOKEN.findall(text))
+
+
+def _best(scores: dict):
+    """
+    Index with the highest score, the earliest one on a tie, None when
+    nothing scored. Rounding keeps float noise from breaking ties.
+    """
+    if not scores:
+        return None
+    return min(scores, key=lambda index: (-round(scores[index], 9), index))
+
+
+class KeywordMatcher:
+    """
+    Scores every pet type and intent of a message and picks the best.
+
+    The tables become a sparse keyword x (pet types, intents) weight
+    matrix. Keywords are token tuples, and each row lists the pet types
+    and intents holding the keyword with its weight there: its number
+    of words (phrases are more specific) divided by how many entries
+    share it, times the intent's "weight" in the intents file
+    (default 1). Scoring a message adds up the rows of the keywords
+    found in it, a sparse dot product whose cost does not grow with the
+    size of the tables. Ties go to the entry listed first.
+
+    With fuzzy=True, misspelt words ("vacine", "puppys") count for the
+    keyword they were meant to be at FUZZY_WEIGHT, see fuzzy.py. Words
+    in known_words ("feeling") are real words, never typos. A typo only
+    counts for intents when no keyword of any intent is spelt right, so
+    one misread word never outweighs what the message clearly says.
+
+    Everything is plain dicts and tuples, so a saved matcher loads
+    without any compiling (see to_state / from_state).
+    """
+
+    def __init__(self, pet_types: dict, intents: dict, fuzzy: bool = True, known_words=()):
+        self.pet_names = list(pet_types)
+        self.intent_names = list(intents)
+
+        pet_rows, intent_rows = {}, {}
+        for index, keywords in enumerate(pet_types.values()):
+            for keyword in dict.fromkeys(_tokens(keyword.lower()) for keyword in keywords):
+                pet_rows.setdefault(keyword, []).append(index)
+        for index, data in enumerate(intents.values()):
+            for keyword in dict.fromkeys(_tokens(keyword.lower()) for keyword in data["patterns"]):
+                intent_rows.setdefault(keyword, []).append(index)
+
+        intent_weights = [float(data.get("weight", 1)) for data in intents.values()]
+
+        self.matrix = {}
+        for keyword in {**pet_rows, **intent_rows}:
+            if not keyword:
+                continue
+            pets = pet_rows.get(keyword, ())
+            holders = intent_rows.get(keyword, ())
+            self.matrix[keyword] = (
+                tuple((index, len(keyword) / len(pets)) for index in pets),
+                tuple((index, len(keyword) / len(holders) * intent_weights[index]) for index in holders),
+            )
+        self.longest = max(map(len, self.matrix), default=1)
+
+        self.fuzzy = None
+        if fuzzy:
+            self.fuzzy = FuzzyVocabulary(
+                (keyword[0] for keyword in self.matrix if len(keyword) == 1 and _WORD.fullmatch(keyword[0])),
+                known_words=(word.lower() for word in known_words),
+            )
+
+    def to_state(self) -> dict:
+        """
+        The matcher as plain data that marshal can store
+        """
+        return {
+            "pet_names": self.pet_names,
+            "intent_names": self.intent_names,
+            "matrix": self.matrix,
+            "longest": self.longest,
+            "fuzzy": self.fuzzy.__getstate__() if self.fuzzy is not None else None,
         }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "KeywordMatcher":
+        matcher = cls.__new__(cls)
+        matcher.pet_names = state["pet_names"]
+        matcher.intent_names = state["intent_names"]
+        matcher.matrix = state["matrix"]
+        matcher.longest = state["longest"]
+        matcher.fuzzy = FuzzyVocabulary.from_state(state["fuzzy"]) if state["fuzzy"] is not None else None
+        return matcher
+
+    def _keywords(self, message: str) -> dict:
+        """
+        Keywords found in a lower-cased message -> what each one counts
+        """
+        tokens = _tokens(message)
+        found = {}
+
+        for start in range(len(tokens)):
+            for end in range(start + 1, min(len(tokens), start + self.longest) + 1):
+                if tokens[start:end] in self.matrix:
+                    found[tokens[start:end]] = 1.0
+
+        if self.fuzzy is not None:
+            unknown = [token for token in tokens if (token,) not in self.matrix]
+            for word in unknown[:MAX_FUZZY_WORDS]:
+                for keyword in self.fuzzy.lookup(word):
+                    found.setdefault((keyword,), FUZZY_WEIGHT)
+
+        return found
+
+    def scores(self, message: str):
+        """
+        ({pet type index: score}, {intent index: score}) for a
+        lower-cased message, holding only what scored
+        """
+        found = self._keywords(message)
+        exact_intent = any(factor == 1.0 and self.matrix[keyword][1] for keyword, factor in found.items())
+
+        pet_scores, intent_scores = {}, {}
+        for keyword, factor in found.items():
+            pets, intents = self.matrix[keyword]
+            for index, weight in pets:
+                pet_scores[index] = pet_scores.get(index, 0.0) + weight * factor
+            if exact_intent and factor != 1.0:
+                continue
+            for index, weight in intents:
+                intent_scores[index] = intent_scores.get(index, 0.0) + weight * factor
+        return pet_scores, intent_scores
+
+    def classify(self, message: str):
+        """
+        Returns (pet_type, intent) for a lower-cased message. pet_type
+        falls back to "default" and intent to None.
+        """
+        pet_scores, intent_scores = self.scores(message)
+        pet, intent = _best(pet_scores), _best(intent_scores)
+        return (
+            self.pet_names[pet] if pet is not None else "default",
+            self.intent_names[intent] if intent is not None else None,
+        )
+
+
+# =========================================================
+# CLASSIFICATION CACHE
+# =========================================================
+
+# Longer messages are rarely repeated word for word, they skip the cache
+MAX_CACHED_MESSAGE_LENGTH = 200
+
+
+class ClassificationCache:
+    """
+    Bounded LRU of normalized message -> (pet_type, intent) from the
+    current matcher. Only the classification is kept, replies are still
+    picked at random.
+    """
+
+    def __init__(self, matcher: KeywordMatcher, maxsize: int):
+        self.matcher = matcher
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def classify(self, message: str):
+        if len(message) > MAX_CACHED_MESSAGE_LENGTH:
+            return self.matcher.classify(message)
+
+        with self._lock:
+            result = self._entries.get(message)
+            if result is not None:
+                self._entries.move_to_end(message)
+                self._counters["hits"] += 1
+                return result
+            self._counters["misses"] += 1
+            matcher, generation = self.matcher, self._generation
+
+        result = matcher.classify(message)
+
+        with self._lock:
+            # Matcher replaced meanwhile: the result is from the old tables
+            if generation == self._generation:
+                self._entries[message] = result
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self._counters["evictions"] += 1
+        return result
+
+    def replace_matcher(self, matcher: KeywordMatcher):
+        with self._lock:
+            self.matcher = matcher
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["size"] = len(self._entries)
+        stats["maxsize"] = self.maxsize
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+# Holds an empty matcher until load_intents() below installs the real one
+_CLASSIFIER = ClassificationCache(KeywordMatcher({}, {}), settings.CHATBOT_CLASSIFY_CACHE_SIZE)
+
+
+def rebuild_matcher():
+    """
+    Recompile the matcher after PET_TYPES or INTENTS changed in memory,
+    dropping every classification cached from the old tables
+    """
+    _CLASSIFIER.replace_matcher(KeywordMatcher(PET_TYPES, INTENTS, known_words=KNOWN_WORDS))
+
+
+def normalize_message(user_message: str) -> str:
+    return " ".join(user_message.lower().split())
+
+
+def classify_message(user_message: str):
+    """
+    Returns (pet_type, intent) for a raw user message
+    """
+    reload_if_changed()
+    return _CLASSIFIER.classify(normalize_message(user_message))
+
+
+def stats():
+    """
+    Classification cache counters for this process: hits, misses,
+    evictions, size, maxsize, hit_rate
+    """
+    return _CLASSIFIER.stats()
+
+
+# =========================================================
+# KNOWLEDGE BASE (INTENTS FILE)
+# =========================================================
+
+# Part of the cache file name: bump it whenever KeywordMatcher changes
+# shape, so matchers saved by older code are never loaded
+MATCHER_FORMAT = 4
+
+_reload_lock = threading.Lock()
+_source = {"path": None, "stamp": None, "digest": None, "version": None, "checked_at": 0.0}
+
+
+def _strings(value) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+def read_intents(path):
+    """
+    Returns (SHA-256 of the file, its parsed content). Raises ValueError
+    when the content is not a usable knowledge base.
+    """
+    raw = Path(path).read_bytes()
+    data = json.loads(raw)
+
+    # Every shape is checked here: a reload that gets past this must
+    # not fail later inside a chat request
+    if not isinstance(data, dict):
+        raise ValueError("expected an object at the top level")
+    if not isinstance(data.get("pet_types"), dict) or not isinstance(data.get("intents"), dict):
+        raise ValueError('expected "pet_types" and "intents" objects')
+    for name, keywords in data["pet_types"].items():
+        if not _strings(keywords):
+            raise ValueError(f'pet type "{name}" needs a list of keywords')
+    for name, intent in data["intents"].items():
+        if not isinstance(intent, dict):
+            raise ValueError(f'intent "{name}" must be an object')
+        if not intent.get("patterns") or not _strings(intent["patterns"]):
+            raise ValueError(f'intent "{name}" needs a list of patterns')
+        responses = intent.get("responses")
+        if not isinstance(responses, dict) or not responses.get("default"):
+            raise ValueError(f'intent "{name}" needs responses with a "default" one')
+        for pet_type, answers in responses.items():
+            if not answers or not _strings(answers):
+                raise ValueError(f'intent "{name}" needs a list of "{pet_type}" responses')
+        weight = intent.get("weight", 1)
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight <= 0:
+            raise ValueError(f'intent "{name}" needs a positive number as "weight"')
+    if not _strings(data.get("known_words", [])):
+        raise ValueError('"known_words" must be a list of words')
+
+    return hashlib.sha256(raw).hexdigest(), data
+
+
+def _trusted(stat) -> bool:
+    # Only what this user wrote and nobody else can change
+    if hasattr(os, "getuid") and stat.st_uid != os.getuid():
+        return False
+    return not stat.st_mode & 0o022
+
+
+def _cache_directory():
+    """
+    CHATBOT_MATCHER_CACHE_DIR, created private to this user, or None
+    when it can't be trusted (or created)
+    """
+    directory = Path(settings.CHATBOT_MATCHER_CACHE_DIR)
+    try:
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if _trusted(directory.stat()):
+            return directory
+    except OSError:
+        logger.warning("Could not create the chatbot matcher cache %s", directory, exc_info=True)
+        return None
+    logger.warning("Not using the chatbot matcher cache %s: owned or writable by another user", directory)
+    return None
+
+
+def compiled_matcher(pet_types: dict, intents: dict, digest: str, known_words=()) -> KeywordMatcher:
+    """
+    The KeywordMatcher of these tables, from the disk cache when this
+    content was built before. digest identifies the content.
+
+    The cache holds marshal data (dicts, tuples, strings and numbers),
+    never pickles, and is only read from a directory and files owned by
+    this user and writable by nobody else.
+    """
+    directory = _cache_directory()
+    if directory is None:
+        return KeywordMatcher(pet_types, intents, known_words=known_words)
+
+    path = directory / f"matcher-v{MATCHER_FORMAT}-{digest}.marshal"
+    try:
+        with open(path, "rb") as cached:
+            if _trusted(os.fstat(cached.fileno())):
+                return KeywordMatcher.from_state(marshal.load(cached))
+            logger.warning("Ignoring chatbot matcher cache %s: owned or writable by another user", path)
+    except FileNotFoundError:
+        pass
+    except Exception:  # Truncated or unreadable, build it again
+        logger.warning("Ignoring broken chatbot matcher cache %s", path, exc_info=True)
+
+    matcher = KeywordMatcher(pet_types, intents, known_words=known_words)
+    try:
+        partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with os.fdopen(os.open(partial, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as cache_file:
+            marshal.dump(matcher.to_state(), cache_file)
+        os.replace(partial, path)
+    except (OSError, ValueError):
+        logger.warning("Could not cache the chatbot matcher in %s", directory, exc_info=True)
+    return matcher
+
+
+def _file_stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_intents(path=None):
+    """
+    Read the intents file and put its tables and matcher in use.
+    Returns the content digest.
+    """
+    global PET_TYPES, INTENTS, KNOWN_WORDS
+
+    path = path or settings.CHATBOT_INTENTS_FILE
+    stamp = _file_stamp(path)
+    digest, data = read_intents(path)
+
+    if digest != _source["digest"]:
+        matcher = compiled_matcher(data["pet_types"], data["intents"], digest, data.get("known_words", ()))
+        PET_TYPES, INTENTS, KNOWN_WORDS = data["pet_types"], data["intents"], data.get("known_words", [])
+        _CLASSIFIER.replace_matcher(matcher)
+
+    _source.update(path=path, stamp=stamp, digest=digest, version=data.get("version"))
+    return digest
+
+
+def reload_if_changed():
+    """
+    Load the intents file again when it was edited. The file is checked
+    at most every CHATBOT_INTENTS_RELOAD_SECONDS, by one thread at a
+    time. An edit that fails to load is logged and the tables in use
+    are kept.
+    """
+    interval = settings.CHATBOT_INTENTS_RELOAD_SECONDS
+    now = time.monotonic()
+    if not interval or now - _source["checked_at"] < interval:
+        return
+    if not _reload_lock.acquire(blocking=False):
+        return
+
+    try:
+        _source["checked_at"] = now
+        path = _source["path"]
+        if _file_stamp(path) != _source["stamp"]:
+            load_intents(path)
+            logger.info("Loaded chatbot intents version %s from %s", _source["version"], path)
+    except (OSError, ValueError) as error:
+        logger.error("Keeping the current chatbot intents, %s could not be loaded: %s", path, error)
+    finally:
+        _reload_lock.release()
+
+
+def knowledge_base():
+    """
+    What is in use: path, version, digest, intent and keyword counts
+    """
+    matcher = _CLASSIFIER.matcher
+    return {
+        "path": str(_source["path"]),
+        "version": _source["version"],
+        "digest": _source["digest"],
+        "intents": len(matcher.intent_names),
+        "keywords": len(matcher.matrix),
     }
-}
+
+
+try:
+    load_intents()
+except (OSError, ValueError) as error:
+    raise ImproperlyConfigured(f"Cannot load CHATBOT_INTENTS_FILE: {error}") from error
 
 
 # =========================================================
 # MAIN CHATBOT FUNCTION
 # =========================================================
 
-def get_chatbot_response(user_message: str) -> str:
-    message = user_message.lower()
-    pet_type = detect_pet_type(message)
-
-    for intent, data in INTENTS.items():
-        for pattern in data["patterns"]:
-            if re.search(rf"\b{pattern}\b", message):
-                responses = data["responses"].get(
-                    pet_type,
-                    data["responses"]["default"]
-                )
-                return random.choice(responses)
-
-    return (
-        "🤔 I'm not sure I understood that.\n\n"
-        "You can ask about:\n"
-        "🍖 Food • 💉 Vaccination • ✂️ Grooming • 🏥 Health • 🐾 Adoption\n\n"
-        "Examples:\n"
-        "• food for dog\n"
-        "• how to vaccinate my cat\n"
-        "• grooming tips for bird"
-    )
+FALLBACK_RESPONSE = (
+    "🤔 I'm not sure I understood that.\n\n"
+    "You can ask about:\n"
+    "🍖 Food • 💉 Vaccination • ✂️ Grooming • 🏥 Health • 🐾 Adoption\n\n"
+    "Examples:\n"
+    "• food for dog\n"
+    "• how to vaccinate my cat\n"
+    "• grooming tips for bird"
+)
+
+
+def answer_message(user_message: str, session_id=None):
+    """
+    Returns (response, pet_type, intent) for one message. With a
+    session_id, a message naming no pet is answered for the pet type
+    of that conversation's recent turns (see chat_context.py).
+    """
+    pet_type, intent = classify_message(user_message)
+
+    if session_id is not None:
+        if pet_type == "default":
+            pet_type = chat_context.store.last_pet_type(session_id) or "default"
+        chat_context.store.remember(session_id, pet_type, intent)
+
+    if intent is None:
+        return FALLBACK_RESPONSE, pet_type, intent
+
+    intents = INTENTS
+    if intent not in intents:  # Removed by a reload since it was classified
+        return FALLBACK_RESPONSE, pet_type, None
+
+    responses = intents[intent]["responses"]
+    return random.choice(responses.get(pet_type, responses["default"])), pet_type, intent
+
+
+def answer_messages(user_messages, session_id=None):
+    """
+    Batch version of answer_message, one result per message, in order
+    """
+    return [answer_message(message, session_id) for message in user_messages]
+
+
+def get_chatbot_response(user_message: str, session_id=None) -> str:
+    return answer_message(user_message, session_id)[0]
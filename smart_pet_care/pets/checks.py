@@ -0,0 +1,59 @@
+"""
+System checks for settings that only work with a shared cache.
+"""
+
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+# Cache backends that each process keeps to itself
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+CACHE_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+@register(Tags.caches)
+def check_session_cache(app_configs, **kwargs):
+    """
+    Cached sessions on a per-process cache: a logout seen by one worker
+    leaves the session usable on the others
+    """
+    if settings.SESSION_ENGINE not in CACHE_SESSION_ENGINES:
+        return []
+
+    alias = settings.SESSION_CACHE_ALIAS
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+
+    return [Error(
+        f'SESSION_ENGINE {settings.SESSION_ENGINE} needs a shared cache, '
+        f'but the "{alias}" cache is {backend}.',
+        hint="Use the db session engine, or point the cache at Redis or Memcached.",
+        id='pets.E001',
+    )]
+
+
+@register(Tags.caches)
+def check_catalog_cache(app_configs, **kwargs):
+    """
+    The catalog versions on a per-process cache: a pet saved through
+    one worker leaves the others serving the old grid and 304s. Only
+    outside DEBUG, a single development server is fine.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if settings.DEBUG or backend != 'django.core.cache.backends.locmem.LocMemCache':
+        return []
+
+    return [Warning(
+        f'The catalog cache (see pets/catalog_cache.py) is {backend}, so with several '
+        'workers a pet change is only seen by the worker that made it, for up to '
+        f'CATALOG_CACHE_TIMEOUT ({settings.CATALOG_CACHE_TIMEOUT}s).',
+        hint='Point the default cache at Redis or Memcached, or silence pets.W001 when running one process.',
+        id='pets.W001',
+    )]
@@ -0,0 +1,254 @@
+"""
+Sends reminder notifications when they fall due.
+
+ReminderDispatcher keeps the next due time of every reminder inside a
+look-ahead horizon in a min-heap, so the daemon only has to sleep until
+the top of the heap. Edited or new reminders are picked up by polling
+Reminder.updated_at instead of rescanning the table. Due reminders are
+emailed in batches over one connection and marked with a single bulk
+UPDATE, which does not touch updated_at.
+
+A reminder that fails to schedule is logged and left out, it never
+stops the others from being loaded or picked up.
+
+Heap entries are never removed in place. Each reminder's current due
+time is kept in `self.scheduled`, and entries that no longer match it
+are skipped when popped.
+"""
+
+import heapq
+import logging
+import time as time_module
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import Reminder
+from .recurrence import occurrence_datetimes
+
+logger = logging.getLogger(__name__)
+
+
+def _aware(naive):
+    return timezone.make_aware(naive, timezone.get_current_timezone())
+
+
+def _naive_local(aware):
+    return timezone.localtime(aware).replace(tzinfo=None)
+
+
+def _end_of_day(aware):
+    """
+    Last instant of aware's local date. The horizon is kept on day
+    boundaries because candidate rows are picked by reminder_date.
+    """
+    return _aware(datetime.combine(timezone.localtime(aware).date(), time.max))
+
+
+class ReminderDispatcher:
+
+    def __init__(self, horizon=None, catchup=None, batch_size=None):
+        self.horizon = horizon or timedelta(hours=settings.REMINDER_DISPATCH_HORIZON_HOURS)
+        self.catchup = catchup or timedelta(hours=settings.REMINDER_DISPATCH_CATCHUP_HOURS)
+        self.batch_size = batch_size or settings.REMINDER_DISPATCH_BATCH_SIZE
+
+        self.heap = []
+        self.scheduled = {}
+        self.loaded_until = None
+        self.last_seen_update = None
+
+    # ---------------- SCHEDULING ----------------
+
+    def next_due(self, reminder, now, until):
+        """
+        First occurrence of reminder that has not been sent yet, is no
+        older than the catch-up window and is due before `until`
+        """
+        start = now - self.catchup
+        if reminder.last_notified_at:
+            start = max(start, reminder.last_notified_at + timedelta(microseconds=1))
+        if start > until:
+            return None
+
+        occurrences = occurrence_datetimes(reminder, _naive_local(start), _naive_local(until))
+        return _aware(occurrences[0]) if occurrences else None
+
+    def schedule(self, reminder, now):
+        due = None
+        if not reminder.is_completed:
+            due = self.next_due(reminder, now, self.loaded_until)
+
+        if due is None:
+            self.scheduled.pop(reminder.pk, None)
+        elif self.scheduled.get(reminder.pk) != due:
+            self.scheduled[reminder.pk] = due
+            heapq.heappush(self.heap, (due, reminder.pk))
+
+    def schedule_or_skip(self, reminder, now):
+        """
+        schedule(), logging and skipping a reminder that fails
+        """
+        try:
+            self.schedule(reminder, now)
+        except Exception:
+            logger.exception("Could not schedule reminder %s, skipping it", reminder.pk)
+
+    def _candidates(self, start, end):
+        start, end = timezone.localtime(start).date(), timezone.localtime(end).date()
+        return Reminder.objects.filter(is_completed=False).in_window(start, end).order_by()
+
+    def load(self, now):
+        """
+        Initial fill: everything that can fall due before the horizon
+        """
+        self.loaded_until = _end_of_day(now + self.horizon)
+        # Wall clock, compared with updated_at written by the app
+        self.last_seen_update = timezone.now()
+        for reminder in self._candidates(now - self.catchup, self.loaded_until).iterator():
+            self.schedule_or_skip(reminder, now)
+
+    def refresh(self, now):
+        """
+        Pick up edits since the last poll and extend the horizon
+        """
+        changed = Reminder.objects.filter(updated_at__gte=self.last_seen_update).order_by('updated_at')
+        for reminder in changed.iterator():
+            self.schedule_or_skip(reminder, now)
+            self.last_seen_update = max(self.last_seen_update, reminder.updated_at)
+
+        new_horizon = _end_of_day(now + self.horizon)
+        if new_horizon > self.loaded_until:
+            previous, self.loaded_until = self.loaded_until, new_horizon
+            try:
+                for reminder in self._candidates(previous, new_horizon).iterator():
+                    self.schedule_or_skip(reminder, now)
+            except Exception:
+                # Read the new window again on the next poll
+                self.loaded_until = previous
+                raise
+
+    # ---------------- DISPATCH ----------------
+
+    def seconds_until_next(self, now):
+        while self.heap:
+            due, pk = self.heap[0]
+            if self.scheduled.get(pk) == due:
+                return max((due - now).total_seconds(), 0)
+            heapq.heappop(self.heap)
+        return None
+
+    def pop_due(self, now):
+        """
+        Up to batch_size (reminder id, due time) pairs that are due
+        """
+        batch = []
+        while self.heap and len(batch) < self.batch_size:
+            due, pk = self.heap[0]
+            if due > now:
+                break
+            heapq.heappop(self.heap)
+            if self.scheduled.get(pk) == due:
+                del self.scheduled[pk]
+                batch.append((pk, due))
+        return batch
+
+    def dispatch(self, batch, now):
+        """
+        Email one batch and mark it sent. Returns the number of emails.
+        """
+        due_by_id = dict(batch)
+        # Re-read the rows, they may have been completed or deleted
+        reminders = list(
+            Reminder.objects.filter(pk__in=due_by_id, is_completed=False).select_related('user', 'pet')
+        )
+
+        emails = [
+            self.build_email(reminder, due_by_id[reminder.pk])
+            for reminder in reminders
+            if reminder.user.email
+        ]
+        if emails:
+            try:
+                get_connection().send_messages(emails)
+            except Exception:
+                # Put the batch back so the next pass retries it
+                for pk, due in batch:
+                    self.scheduled[pk] = due
+                    heapq.heappush(self.heap, (due, pk))
+                raise
+
+        # One UPDATE per distinct due time, usually a single one per batch
+        ids_by_due = {}
+        for reminder in reminders:
+            ids_by_due.setdefault(due_by_id[reminder.pk], []).append(reminder.pk)
+        for due, ids in ids_by_due.items():
+            Reminder.objects.filter(pk__in=ids).update(last_notified_at=due)
+
+        for reminder in reminders:
+            reminder.last_notified_at = due_by_id[reminder.pk]
+            if reminder.recurrence_frequency:
+                self.schedule_or_skip(reminder, now)
+
+        return len(emails)
+
+    def build_email(self, reminder, due):
+        local_due = timezone.localtime(due)
+        body = (
+            f"Hi {reminder.user.username},\n\n"
+            f"Reminder: {reminder.title}\n"
+            f"Due: {local_due:%Y-%m-%d %H:%M}\n"
+        )
+        if reminder.pet:
+            body += f"Pet: {reminder.pet.name}\n"
+        if reminder.description:
+            body += f"\n{reminder.description}\n"
+
+        return EmailMessage(
+            subject=f"🔔 {reminder.title}",
+            body=body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[reminder.user.email],
+        )
+
+    def run_pending(self, now=None):
+        """
+        Send everything that is due. Returns the number of emails.
+        """
+        now = now or timezone.now()
+        sent = 0
+        while True:
+            batch = self.pop_due(now)
+            if not batch:
+                return sent
+            sent += self.dispatch(batch, now)
+
+    def run_forever(self, poll_interval):
+        loaded = False
+        next_poll = time_module.monotonic() + poll_interval
+
+        while True:
+            try:
+                if not loaded:
+                    self.load(timezone.now())
+                    loaded = True
+
+                sent = self.run_pending(timezone.now())
+                if sent:
+                    logger.info("Sent %d reminder notifications", sent)
+
+                if time_module.monotonic() >= next_poll:
+                    self.refresh(timezone.now())
+                    next_poll = time_module.monotonic() + poll_interval
+            except Exception:
+                logger.exception("Reminder dispatch failed, retrying after the next poll")
+                time_module.sleep(poll_interval)
+                continue
+            finally:
+                close_old_connections()
+
+            wait = self.seconds_until_next(timezone.now())
+            until_poll = max(next_poll - time_module.monotonic(), 0)
+            time_module.sleep(until_poll if wait is None else min(wait, until_poll))
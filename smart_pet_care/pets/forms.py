@@ -59,9 +59,13 @@ class ReminderForm(forms.ModelForm):
             'pet',
             'reminder_date',
             'reminder_time',
-            'is_recurring'
+            'recurrence_frequency',
+            'recurrence_interval',
+            'recurrence_until',
+            'recurrence_count'
         ]
         widgets = {
             'reminder_date': forms.DateInput(attrs={'type': 'date'}),
             'reminder_time': forms.TimeInput(attrs={'type': 'time'}),
+            'recurrence_until': forms.DateInput(attrs={'type': 'date'}),
         }
@@ -0,0 +1,157 @@
+"""
+Typo-tolerant lookup of single words in a fixed vocabulary.
+
+Each vocabulary word is cut into character bigrams, with ^ and $
+marking its start and end, and an inverted index maps every bigram to
+the words holding it. A word within k edits of another keeps all but at
+most 3k of its bigrams, so a lookup only runs the (bounded) edit
+distance on the few words that pass that count.
+
+Typos are allowed by word length: none below 5 characters, one up to
+7, two from 8 on. The first letter must be right: people rarely slip
+there, and it keeps "seating" from being read as "eating". Real words
+that happen to be that close to a vocabulary word ("feeling" and
+"feeding") are passed as known_words and never read as typos.
+"""
+
+from functools import lru_cache
+
+
+def max_typos(length: int) -> int:
+    if length >= 8:
+        return 2
+    if length >= 5:
+        return 1
+    return 0
+
+
+def _bigrams(word: str) -> set:
+    padded = f"^{word}$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+def _key(first: str, gram: str, length: int) -> str:
+    # The first two parts are one and two characters, so it's unambiguous
+    return f"{first}{gram}{length}"
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (a swap of neighbours is one
+    edit), or limit + 1 as soon as it is certainly above limit
+    """
+    too_far = limit + 1
+    if abs(len(a) - len(b)) > limit:
+        return too_far
+
+    # Only cells within `limit` of the diagonal can stay within limit,
+    # the rest keep too_far
+    before = None
+    previous = [j if j <= limit else too_far for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [too_far] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        row_best = current[0]
+
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            value = previous[j - 1] + (a[i - 1] != b[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1] and before[j - 2] + 1 < value:
+                value = before[j - 2] + 1
+            current[j] = value
+            if value < row_best:
+                row_best = value
+
+        if row_best > limit:
+            return too_far
+        before, previous = previous, current
+
+    return min(previous[-1], too_far)
+
+
+class FuzzyVocabulary:
+    """
+    Finds the vocabulary words a misspelt word was meant to be
+    """
+
+    def __init__(self, words, cache_size: int = 4096, known_words=()):
+        self.words = [word for word in dict.fromkeys(words) if max_typos(len(word))]
+        self.known_words = frozenset(known_words)
+        self.gram_counts = []
+
+        # Keyed by first letter + bigram + length (see _key): only words
+        # sharing the first letter and close enough in length are ever
+        # candidates, so their postings are all a lookup scans.
+        postings = {}
+        for index, word in enumerate(self.words):
+            grams = _bigrams(word)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(_key(word[0], gram, len(word)), []).append(index)
+        # Strings and tuples load several times faster than tuple keys
+        # and lists, which matters for the chatbot's cached matcher
+        self.postings = {key: tuple(indexes) for key, indexes in postings.items()}
+
+        self.cache_size = cache_size
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    def __getstate__(self):
+        # The lookup cache can't be pickled, it starts empty again
+        state = self.__dict__.copy()
+        del state["lookup"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lookup = lru_cache(maxsize=self.cache_size)(self._lookup)
+
+    @classmethod
+    def from_state(cls, state: dict) -> "FuzzyVocabulary":
+        """
+        A vocabulary from the plain dict of __getstate__
+        """
+        vocabulary = cls.__new__(cls)
+        keys = ("words", "known_words", "gram_counts", "postings", "cache_size")
+        vocabulary.__setstate__({key: state[key] for key in keys})
+        return vocabulary
+
+    def _lookup(self, word: str) -> tuple:
+        """
+        The closest vocabulary words within their typo allowance, () if
+        none. A word that is in the vocabulary is its own only match,
+        a known word has none.
+        """
+        if len(word) < 4:  # One short of the shortest word with a typo allowance
+            return ()
+        if word in self.known_words:
+            return ()
+
+        grams = _bigrams(word)
+        best, matches = None, []
+
+        for length in range(len(word) - 2, len(word) + 3):
+            limit = max_typos(length)
+            if abs(length - len(word)) > limit:
+                continue
+
+            shared = {}
+            for gram in grams:
+                for index in self.postings.get(_key(word[0], gram, length), ()):
+                    shared[index] = shared.get(index, 0) + 1
+
+            for index, count in shared.items():
+                if count < max(len(grams), self.gram_counts[index]) - 3 * limit:
+                    continue
+                candidate = self.words[index]
+                distance = edit_distance(word, candidate, limit)
+                if distance > limit or (best is not None and distance > best):
+                    continue
+                if distance != best:
+                    best, matches = distance, []
+                matches.append(candidate)
+
+        return tuple(matches)
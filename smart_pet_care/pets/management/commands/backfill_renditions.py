@@ -0,0 +1,29 @@
+from concurrent.futures import as_completed
+
+from django.core.management.base import BaseCommand
+
+from pets.models import Pet
+from pets.renditions import schedule_renditions
+
+
+class Command(BaseCommand):
+    help = "Generate thumbnail, card and detail renditions for existing pet photos"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate renditions that already exist",
+        )
+
+    def handle(self, *args, **options):
+        image_names = (
+            Pet.objects.exclude(image="").exclude(image__isnull=True)
+            .order_by().values_list("image", flat=True).distinct().iterator()
+        )
+        futures = [schedule_renditions(name, force=options["force"]) for name in image_names]
+
+        written = sum(future.result() for future in as_completed(futures))
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {len(futures)} images, wrote {written} rendition files"
+        ))
@@ -0,0 +1,77 @@
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from pets.models import Adoption, Pet
+
+
+def hammer_pet(pet, users, repeats=2):
+    """
+    Every user requests `pet` `repeats` times, all users at once from
+    their own thread. Returns (Counter of status codes / exception
+    names, elapsed seconds).
+    """
+    url = reverse('adopt_pet', args=[pet.pk])
+    clients = []
+    for user in users:
+        client = Client()
+        client.force_login(user)
+        clients.append(client)
+
+    start_line = threading.Barrier(len(clients))
+
+    def run(client):
+        results = []
+        start_line.wait()
+        try:
+            for _ in range(repeats):
+                try:
+                    results.append(client.get(url).status_code)
+                except Exception as error:
+                    results.append(type(error).__name__)
+        finally:
+            connection.close()
+        return results
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+        outcomes = Counter(status for results in pool.map(run, clients) for status in results)
+    return outcomes, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = "Hammer one pet with concurrent adoption requests and report errors and throughput"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--repeats", type=int, default=5)
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8]
+        pet = Pet.objects.create(
+            name=f"Bench {tag}", breed="Mixed", pet_type="other", age=1, description="Load test",
+        )
+        users = [User.objects.create_user(username=f"bench-{tag}-{i}") for i in range(options["users"])]
+
+        try:
+            outcomes, elapsed = hammer_pet(pet, users, options["repeats"])
+            total = sum(outcomes.values())
+            errors = total - outcomes[302]
+
+            self.stdout.write(
+                f"{total} requests from {len(users)} threads in {elapsed:.2f} s  "
+                f"({total / elapsed:.0f} req/s)  errors {errors}  {dict(outcomes)}"
+            )
+            waitlist = Adoption.objects.filter(pet=pet).waitlist().count()
+            self.stdout.write(f"waitlist: {waitlist} requests (expected {len(users)})")
+        finally:
+            pet.delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
@@ -0,0 +1,188 @@
+import json
+import random
+import re
+import string
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from pets import chatbot
+from pets.chatbot import ClassificationCache, KeywordMatcher
+from pets.fuzzy import FuzzyVocabulary
+
+# Messages labeled with the expected pet type and intent
+CORPUS_FILE = settings.BASE_DIR / "pets" / "data" / "chatbot_corpus.json"
+
+
+SAMPLE_MESSAGES = [
+    "hi there",
+    "what food is best for my dog",
+    "how to vaccinate my cat",
+    "grooming tips for bird",
+    "my rabbit seems sick and has a fever",
+    "thank you so much",
+    "i want to adopt a puppy",
+    "there was an accident and my kitten is bleeding",
+    "what is the weather like today",
+    "can parrots eat avocado",
+]
+
+# Misspelt messages, only the fuzzy matcher understands them
+TYPO_MESSAGES = [
+    "how do i vacine my puppys",
+    "groming tips for my kiten",
+    "my rabit has a fevr",
+    "emergancy my dog is bleding",
+    "best nutrision for cockatiels",
+]
+
+
+def legacy_classify(message, pet_types, intents):
+    """
+    The per-pattern loop the chatbot used before KeywordMatcher
+    """
+    pet_type = "default"
+    for pet, keywords in pet_types.items():
+        if any(re.search(rf"\b{word}\b", message) for word in keywords):
+            pet_type = pet
+            break
+
+    for intent, data in intents.items():
+        for pattern in data["patterns"]:
+            if re.search(rf"\b{pattern}\b", message):
+                return pet_type, intent
+
+    return pet_type, None
+
+
+def load_corpus(path=CORPUS_FILE):
+    """
+    [(message, (pet_type, intent))] from the labeled corpus
+    """
+    with open(path, encoding="utf-8") as corpus:
+        return [(entry["message"], (entry["pet_type"], entry["intent"])) for entry in json.load(corpus)]
+
+
+def corpus_misses(classify, corpus):
+    """
+    [(message, expected, got)] for every message classified wrongly
+    """
+    misses = []
+    for message, expected in corpus:
+        got = classify(message.lower())
+        if got != expected:
+            misses.append((message, expected, got))
+    return misses
+
+
+def scale_tables(factor, seed=0):
+    """
+    Pads every pet type and intent with made-up keywords until the
+    tables hold `factor` times as many patterns as today.
+    """
+    rng = random.Random(seed)
+
+    def filler(count):
+        return [
+            "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10)))
+            for _ in range(count)
+        ]
+
+    pet_types = {
+        pet: keywords + filler(len(keywords) * (factor - 1))
+        for pet, keywords in chatbot.PET_TYPES.items()
+    }
+    intents = {
+        intent: {
+            "patterns": data["patterns"] + filler(len(data["patterns"]) * (factor - 1)),
+            "responses": data["responses"],
+            "weight": data.get("weight", 1),
+        }
+        for intent, data in chatbot.INTENTS.items()
+    }
+    return pet_types, intents
+
+
+def time_per_message(classify, messages, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for message in messages:
+            classify(message)
+    return (time.perf_counter() - start) / (iterations * len(messages))
+
+
+class Command(BaseCommand):
+    help = "Check the chatbot against the labeled corpus and time it against the old per-pattern loop"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--factors", type=int, nargs="+", default=[1, 10, 100])
+
+    def handle(self, *args, **options):
+        messages = [message.lower() for message in SAMPLE_MESSAGES]
+
+        corpus = load_corpus()
+        live = KeywordMatcher(chatbot.PET_TYPES, chatbot.INTENTS, known_words=chatbot.KNOWN_WORDS)
+        legacy_misses = corpus_misses(
+            lambda message: legacy_classify(message, chatbot.PET_TYPES, chatbot.INTENTS), corpus,
+        )
+        misses = corpus_misses(live.classify, corpus)
+        self.stdout.write(
+            f"corpus: {len(corpus)} messages  "
+            f"first match {1 - len(legacy_misses) / len(corpus):.0%}  scored {1 - len(misses) / len(corpus):.0%}"
+        )
+        for message, expected, got in misses:
+            self.stderr.write(f"  {message!r}: expected {expected}, got {got}")
+
+        for factor in options["factors"]:
+            pet_types, intents = scale_tables(factor)
+            pattern_count = sum(map(len, pet_types.values())) + sum(
+                len(data["patterns"]) for data in intents.values()
+            )
+
+            start = time.perf_counter()
+            matcher = KeywordMatcher(pet_types, intents, fuzzy=False)
+            build_ms = (time.perf_counter() - start) * 1000
+
+            fuzzy = KeywordMatcher(pet_types, intents, known_words=chatbot.KNOWN_WORDS)
+            start = time.perf_counter()
+            FuzzyVocabulary(fuzzy.fuzzy.words)
+            fuzzy_build_ms = (time.perf_counter() - start) * 1000
+
+            # The legacy loop gets slow at scale, keep its run bounded.
+            iterations = max(1, options["iterations"] // factor)
+            legacy = time_per_message(
+                lambda message: legacy_classify(message, pet_types, intents),
+                messages,
+                iterations,
+            )
+            compiled = time_per_message(matcher.classify, messages, options["iterations"])
+            scored = time_per_message(fuzzy.classify, messages, options["iterations"])
+
+            # Cleared word cache: every misspelt word is looked up from scratch
+            def cold(message):
+                fuzzy.fuzzy.lookup.cache_clear()
+                return fuzzy.classify(message)
+
+            # Repeated questions, answered from the classification cache
+            cached = ClassificationCache(fuzzy, maxsize=len(messages))
+            repeated = time_per_message(cached.classify, messages, options["iterations"])
+
+            typos = [message.lower() for message in TYPO_MESSAGES]
+            typo_cold = time_per_message(cold, typos, options["iterations"])
+            typo_worst = max(time_per_message(cold, [message], options["iterations"]) for message in typos)
+
+            self.stdout.write(
+                f"{factor:>4}x  {pattern_count:>6} patterns  "
+                f"legacy {legacy * 1e6:9.1f} us/msg  "
+                f"scored {compiled * 1e6:7.1f} us/msg  "
+                f"speedup {legacy / compiled:6.1f}x  "
+                f"(build {build_ms:.1f} ms)"
+            )
+            self.stdout.write(f"      with typo lookups (warm word cache): {scored * 1e6:7.1f} us/msg")
+            self.stdout.write(
+                f"      typos: fuzzy {typo_cold * 1e6:7.1f} us/msg, worst {typo_worst * 1e6:7.1f} us/msg  "
+                f"(index build {fuzzy_build_ms:.1f} ms)"
+            )
+            self.stdout.write(f"      repeated messages, cached: {repeated * 1e6:7.1f} us/msg")
@@ -0,0 +1,71 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from pets import search
+from pets.models import Pet
+
+NAMES = ["Max", "Bella", "Charlie", "Luna", "Rocky", "Daisy", "Milo", "Coco", "Oscar", "Kiwi"]
+BREEDS = ["Labrador Retriever", "German Shepherd", "Persian", "Siamese", "Beagle",
+          "Cockatiel", "Budgerigar", "Holland Lop", "Golden Retriever", "Maine Coon"]
+WORDS = ["friendly", "playful", "calm", "loves", "walks", "children", "gentle", "energetic",
+         "vaccinated", "trained", "shy", "curious", "cuddly", "quiet", "garden", "toys"]
+
+# Common terms first (thousands of matches to rank), then selective ones
+# and a miss, where icontains has to scan every row
+QUERIES = ["labrador", "golden retr", "playful children", "siamese quiet", "maine",
+           "charlie 4242", "oscar 99", "zebra"]
+
+
+def make_pets(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        Pet(
+            name=f"{rng.choice(NAMES)} {i}",
+            breed=rng.choice(BREEDS),
+            pet_type=rng.choice(["dog", "cat", "bird", "rabbit"]),
+            age=rng.randint(0, 15),
+            description=" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))),
+        )
+        for i in range(count)
+    ]
+
+
+def time_query(run, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        run()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def icontains(queryset, query, limit):
+    for term in query.split():
+        queryset = queryset.filter(
+            Q(name__icontains=term) | Q(breed__icontains=term) | Q(description__icontains=term)
+        )
+    return list(queryset.order_by("-added_date")[:limit])
+
+
+class Command(BaseCommand):
+    help = "Time ranked full-text pet search against icontains (test rows are rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pets", type=int, default=100_000)
+        parser.add_argument("--iterations", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            Pet.objects.bulk_create(make_pets(options["pets"]), batch_size=5000)
+            indexed = search.rebuild()
+            self.stdout.write(f"{indexed} pets indexed")
+
+            available = Pet.objects.filter(status="available")
+            for query in QUERIES:
+                fts = time_query(lambda: list(search.search(available, query, 60)), options["iterations"])
+                like = time_query(lambda: icontains(available, query, 60), max(1, options["iterations"] // 5))
+                self.stdout.write(f"{query!r:<20} fts {fts:7.2f} ms   icontains {like:8.2f} ms")
+
+            transaction.set_rollback(True)
@@ -0,0 +1,69 @@
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+MODES = {
+    "db, save every request": {
+        "SESSION_ENGINE": "django.contrib.sessions.backends.db",
+        "SESSION_SAVE_EVERY_REQUEST": True,
+    },
+    "db, sliding expiry": {
+        "SESSION_ENGINE": "django.contrib.sessions.backends.db",
+        "SESSION_SAVE_EVERY_REQUEST": False,
+    },
+    "cached_db, sliding expiry": {
+        "SESSION_ENGINE": "django.contrib.sessions.backends.cached_db",
+        "SESSION_SAVE_EVERY_REQUEST": False,
+    },
+}
+
+PAGES = ["home", "pet_list", "user_dashboard", "reminder_list"]
+
+
+def browse(user, requests):
+    """
+    Log user in, then load the main pages `requests` times. Returns
+    (session writes, session reads, seconds), login excluded.
+    """
+    client = Client()
+    client.force_login(user)
+
+    started = time.perf_counter()
+    with CaptureQueriesContext(connection) as captured:
+        for i in range(requests):
+            client.get(reverse(PAGES[i % len(PAGES)]))
+    elapsed = time.perf_counter() - started
+
+    sql = [query["sql"] for query in captured.captured_queries if '"django_session"' in query["sql"]]
+    writes = sum(1 for statement in sql if not statement.startswith("SELECT"))
+    return writes, len(sql) - writes, elapsed
+
+
+class Command(BaseCommand):
+    help = "Compare session writes per request: save-every-request vs sliding expiry"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(username=f"bench-{uuid.uuid4().hex[:8]}")
+        try:
+            for name, overrides in MODES.items():
+                cache.clear()
+                with override_settings(**overrides):
+                    writes, reads, elapsed = browse(user, options["requests"])
+                requests = options["requests"]
+                self.stdout.write(
+                    f"{name:<28} writes/request {writes / requests:5.2f}  "
+                    f"db reads/request {reads / requests:5.2f}  "
+                    f"{requests / elapsed:6.0f} req/s"
+                )
+        finally:
+            user.delete()
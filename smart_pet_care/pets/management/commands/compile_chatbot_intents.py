@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from pets.chatbot import compiled_matcher, read_intents
+
+
+class Command(BaseCommand):
+    help = "Check the chatbot intents file and build its cached matcher, so workers start without building it"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default=settings.CHATBOT_INTENTS_FILE,
+            help="Intents file, CHATBOT_INTENTS_FILE by default",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            digest, data = read_intents(options["path"])
+        except (OSError, ValueError) as error:
+            raise CommandError(f"{options['path']}: {error}")
+
+        start = time.perf_counter()
+        matcher = compiled_matcher(data["pet_types"], data["intents"], digest, data.get("known_words", ()))
+        elapsed = (time.perf_counter() - start) * 1000
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Version {data.get('version')}: {len(matcher.intent_names)} intents, "
+            f"{len(matcher.matrix)} keywords, matcher ready in {elapsed:.1f} ms ({digest[:12]})"
+        ))
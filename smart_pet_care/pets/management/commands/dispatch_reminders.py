@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from pets.dispatcher import ReminderDispatcher
+
+
+class Command(BaseCommand):
+    help = "Email reminders as they fall due (runs until stopped, or once with --once)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Send what is due now and exit, e.g. from cron",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.REMINDER_DISPATCH_POLL_SECONDS,
+            help="Seconds between checks for new or edited reminders",
+        )
+        parser.add_argument(
+            "--horizon-hours",
+            type=float,
+            default=settings.REMINDER_DISPATCH_HORIZON_HOURS,
+            help="How far ahead reminders are kept in memory",
+        )
+
+    def handle(self, *args, **options):
+        dispatcher = ReminderDispatcher(horizon=timedelta(hours=options["horizon_hours"]))
+
+        if options["once"]:
+            now = timezone.now()
+            dispatcher.load(now)
+            sent = dispatcher.run_pending(now)
+            self.stdout.write(self.style.SUCCESS(f"Sent {sent} reminder notifications"))
+            return
+
+        self.stdout.write("Dispatching reminders, press Ctrl+C to stop")
+        try:
+            dispatcher.run_forever(options["poll_interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped")
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from pets.chat_log import prune_history
+
+
+class Command(BaseCommand):
+    help = "Delete chatbot conversations older than the retention period, in bounded chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.CHATBOT_HISTORY_RETENTION_DAYS,
+            help="Keep chats newer than this many days",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.CHATBOT_PRUNE_BATCH_SIZE,
+            help="Rows deleted per chunk",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0,
+            help="Seconds to pause between chunks to let other writers in",
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_history(
+            retention_days=options["days"],
+            batch_size=options["batch_size"],
+            sleep=options["sleep"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} chat rows"))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pets import search
+
+
+class Command(BaseCommand):
+    help = "Re-fill the pet full-text search index from the pets table"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            indexed = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} pets"))
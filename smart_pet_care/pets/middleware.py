@@ -0,0 +1,42 @@
+"""
+Sliding session expiry without a session write per request.
+
+With SESSION_SAVE_EVERY_REQUEST every request that touches the session
+rewrites it, just to push the expiry date back. Instead, the time of
+the last save is kept in the session and an unchanged session is only
+re-saved once it is SESSION_REFRESH_SECONDS old. Sessions then expire
+between SESSION_COOKIE_AGE - SESSION_REFRESH_SECONDS and
+SESSION_COOKIE_AGE after the last request.
+
+Must come after SessionMiddleware, so its response phase runs first.
+"""
+
+import time
+
+from django.conf import settings
+
+REFRESHED_KEY = '_refreshed_at'
+
+
+class SlidingSessionMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        session = getattr(request, 'session', None)
+        # Untouched sessions stay unloaded, empty ones aren't stored
+        if session is None or not session.accessed or session.is_empty():
+            return response
+        if settings.SESSION_SAVE_EVERY_REQUEST or settings.SESSION_EXPIRE_AT_BROWSER_CLOSE:
+            return response
+
+        now = int(time.time())
+        refreshed = session.get(REFRESHED_KEY)
+        if session.modified or refreshed is None or now - refreshed >= settings.SESSION_REFRESH_SECONDS:
+            # Marks the session modified, so SessionMiddleware saves it
+            # with a new expiry date and cookie
+            session[REFRESHED_KEY] = now
+        return response
@@ -0,0 +1,101 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Pet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('breed', models.CharField(max_length=100)),
+                ('pet_type', models.CharField(choices=[('dog', 'Dog'), ('cat', 'Cat'), ('bird', 'Bird'), ('rabbit', 'Rabbit'), ('other', 'Other')], default='dog', max_length=20)),
+                ('age', models.IntegerField(help_text='Age in years')),
+                ('description', models.TextField()),
+                ('health_status', models.CharField(default='Healthy', max_length=200)),
+                ('image', models.ImageField(blank=True, null=True, upload_to='pets/')),
+                ('status', models.CharField(choices=[('available', 'Available'), ('adopted', 'Adopted'), ('pending', 'Pending')], default='available', max_length=20)),
+                ('added_date', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-added_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone', models.CharField(blank=True, max_length=15)),
+                ('address', models.TextField(blank=True)),
+                ('city', models.CharField(blank=True, max_length=100)),
+                ('state', models.CharField(blank=True, max_length=100)),
+                ('pincode', models.CharField(blank=True, max_length=10)),
+                ('profile_picture', models.ImageField(blank=True, null=True, upload_to='profiles/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='profile', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Reminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('reminder_type', models.CharField(choices=[('vaccination', 'Vaccination'), ('feeding', 'Feeding'), ('grooming', 'Grooming'), ('vet_visit', 'Vet Visit'), ('medication', 'Medication'), ('other', 'Other')], default='other', max_length=20)),
+                ('reminder_date', models.DateField()),
+                ('reminder_time', models.TimeField()),
+                ('is_recurring', models.BooleanField(default=False)),
+                ('is_completed', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('pet', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='pets.pet')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['reminder_date', 'reminder_time'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ChatbotQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.TextField()),
+                ('response', models.TextField()),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('session_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='chatbot_queries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Chatbot Query',
+                'verbose_name_plural': 'Chatbot Queries',
+                'ordering': ['-timestamp'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Adoption',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('request_date', models.DateTimeField(auto_now_add=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], default='pending', max_length=20)),
+                ('admin_notes', models.TextField(blank=True, null=True)),
+                ('approved_date', models.DateTimeField(blank=True, null=True)),
+                ('pet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='adoption_requests', to='pets.pet')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='adoptions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-request_date'],
+                'unique_together': {('user', 'pet')},
+            },
+        ),
+    ]
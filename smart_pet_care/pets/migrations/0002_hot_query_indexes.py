@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='adoption',
+            index=models.Index(fields=['user', 'status'], name='adoption_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chatbotquery',
+            index=models.Index(fields=['user', 'timestamp'], name='chatbot_user_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['status', '-added_date', '-id'], name='pet_status_added_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['status', 'pet_type', '-added_date', '-id'], name='pet_status_type_added_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reminder',
+            index=models.Index(fields=['user', 'is_completed', 'reminder_date', 'reminder_time'], name='reminder_user_due_idx'),
+        ),
+    ]
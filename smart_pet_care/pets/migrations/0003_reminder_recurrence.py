@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:23
+
+from django.db import migrations, models
+
+
+def recurring_means_daily(apps, schema_editor):
+    """
+    Reminders ticked recurring before there was a rule repeat daily,
+    the same default the reminder form uses
+    """
+    Reminder = apps.get_model('pets', 'Reminder')
+    Reminder.objects.filter(is_recurring=True, recurrence_frequency='').update(recurrence_frequency='daily')
+
+
+def clear_frequency(apps, schema_editor):
+    Reminder = apps.get_model('pets', 'Reminder')
+    Reminder.objects.exclude(recurrence_frequency='').update(recurrence_frequency='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0002_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reminder',
+            name='recurrence_count',
+            field=models.PositiveIntegerField(blank=True, help_text='Stop after this many occurrences', null=True),
+        ),
+        migrations.AddField(
+            model_name='reminder',
+            name='recurrence_frequency',
+            field=models.CharField(blank=True, choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly')], max_length=10),
+        ),
+        migrations.AddField(
+            model_name='reminder',
+            name='recurrence_interval',
+            field=models.PositiveIntegerField(default=1, help_text='Repeat every N days / weeks / months'),
+        ),
+        migrations.AddField(
+            model_name='reminder',
+            name='recurrence_until',
+            field=models.DateField(blank=True, help_text='Last date an occurrence may fall on', null=True),
+        ),
+        migrations.RunPython(recurring_means_daily, clear_frequency),
+    ]
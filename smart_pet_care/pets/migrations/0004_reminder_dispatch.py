@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0003_reminder_recurrence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reminder',
+            name='last_notified_at',
+            field=models.DateTimeField(blank=True, help_text='Due time of the last occurrence sent out', null=True),
+        ),
+        migrations.AddField(
+            model_name='reminder',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:05
+
+from datetime import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+
+def backfill_due_at(apps, schema_editor):
+    """
+    Fill due_at from reminder_date / reminder_time, BATCH_SIZE rows at
+    a time so memory use doesn't depend on the table size
+    """
+    Reminder = apps.get_model('pets', 'Reminder')
+    last_pk = 0
+
+    while True:
+        batch = list(
+            Reminder.objects.filter(pk__gt=last_pk, due_at__isnull=True)
+            .order_by('pk')
+            .only('pk', 'reminder_date', 'reminder_time')[:BATCH_SIZE]
+        )
+        if not batch:
+            return
+
+        for reminder in batch:
+            reminder.due_at = timezone.make_aware(
+                datetime.combine(reminder.reminder_date, reminder.reminder_time)
+            )
+        Reminder.objects.bulk_update(batch, ['due_at'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0004_reminder_dispatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reminder',
+            name='due_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_due_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='reminder',
+            name='due_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AlterModelOptions(
+            name='reminder',
+            options={'ordering': ['due_at']},
+        ),
+        migrations.RemoveIndex(
+            model_name='reminder',
+            name='reminder_user_due_idx',
+        ),
+        migrations.AddIndex(
+            model_name='reminder',
+            index=models.Index(condition=models.Q(('is_completed', False)), fields=['user', 'due_at'], name='reminder_user_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reminder',
+            index=models.Index(fields=['due_at'], name='reminder_due_idx'),
+        ),
+    ]
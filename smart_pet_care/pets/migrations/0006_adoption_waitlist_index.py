@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0005_reminder_due_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='adoption',
+            index=models.Index(fields=['pet', 'status', 'request_date'], name='adoption_pet_waitlist_idx'),
+        ),
+    ]
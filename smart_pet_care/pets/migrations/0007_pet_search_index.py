@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:40
+
+from django.db import migrations
+
+
+def create_fts_table(apps, schema_editor):
+    """
+    FTS5 mirror of the Pet text columns, SQLite only (see pets/search.py)
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS pets_pet_fts USING fts5("
+        "name, breed, description, tokenize = 'porter unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        "INSERT INTO pets_pet_fts (rowid, name, breed, description) "
+        "SELECT id, name, breed, description FROM pets_pet"
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS pets_pet_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0006_adoption_waitlist_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -1,7 +1,12 @@
+from datetime import datetime, time, timedelta
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.functions import Coalesce, RowNumber
 from django.utils import timezone
 
+from .recurrence import expand
+
 # Pet Model
 class Pet(models.Model):
     PET_TYPES = [
@@ -33,6 +38,76 @@ class Pet(models.Model):
     
     class Meta:
         ordering = ['-added_date']
+        indexes = [
+            # pet_list: available pets, newest first (keyset on added_date, id)
+            models.Index(fields=['status', '-added_date', '-id'], name='pet_status_added_idx'),
+            models.Index(fields=['status', 'pet_type', '-added_date', '-id'], name='pet_status_type_added_idx'),
+        ]
+
+
+# Adoption QuerySet
+class AdoptionQuerySet(models.QuerySet):
+
+    def approve(self, now=None):
+        """
+        Approve the pending requests in this queryset, at most one per
+        pet (the oldest) and only for pets that aren't adopted yet. The
+        other pending requests for those pets are rejected and the pets
+        marked adopted. Always four queries, whatever the selection size.
+
+        update() sends no signals, the caller invalidates caches. Returns
+        (approved, auto-rejected, pet types of the adopted pets).
+        """
+        now = now or timezone.now()
+
+        winners = list(
+            self.filter(status='pending').exclude(pet__status='adopted')
+            .annotate(position=models.Window(
+                RowNumber(),
+                partition_by=models.F('pet'),
+                order_by=[models.F('request_date').asc(), models.F('id').asc()],
+            ))
+            .filter(position=1)
+            .values_list('pk', 'pet_id', 'pet__pet_type')
+        )
+        if not winners:
+            return 0, 0, set()
+
+        adoption_ids = [pk for pk, _, _ in winners]
+        pet_ids = [pet_id for _, pet_id, _ in winners]
+
+        approved = Adoption.objects.filter(pk__in=adoption_ids).update(status='approved', approved_date=now)
+        rejected = Adoption.objects.filter(pet_id__in=pet_ids, status='pending').update(status='rejected')
+        Pet.objects.filter(pk__in=pet_ids).update(status='adopted')
+
+        return approved, rejected, {pet_type for _, _, pet_type in winners}
+
+    def reject(self):
+        """
+        Reject the pending requests in this queryset in one UPDATE
+        """
+        return self.filter(status='pending').update(status='rejected')
+
+    def waitlist(self):
+        """
+        Pending requests in first-come order, per pet the head of the
+        list is the one approve() picks
+        """
+        return self.filter(status='pending').order_by('pet', 'request_date', 'id')
+
+    def with_waitlist_position(self):
+        """
+        Annotates waitlist_position: 1 + pending requests for the same pet
+        that came in earlier. Only meaningful on pending rows.
+        """
+        ahead = Adoption.objects.filter(
+            models.Q(request_date__lt=models.OuterRef('request_date')) |
+            models.Q(request_date=models.OuterRef('request_date'), id__lt=models.OuterRef('id')),
+            pet=models.OuterRef('pet'),
+            status='pending',
+        ).order_by().values('pet').annotate(total=models.Count('pk')).values('total')
+
+        return self.annotate(waitlist_position=Coalesce(models.Subquery(ahead), 0) + 1)
 
 
 # Adoption Request Model
@@ -49,6 +124,8 @@ class Adoption(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     admin_notes = models.TextField(blank=True, null=True)
     approved_date = models.DateTimeField(blank=True, null=True)
+
+    objects = AdoptionQuerySet.as_manager()
     
     def __str__(self):
         return f"{self.user.username} - {self.pet.name} ({self.status})"
@@ -56,6 +133,74 @@ class Adoption(models.Model):
     class Meta:
         ordering = ['-request_date']
         unique_together = ['user', 'pet']
+        indexes = [
+            models.Index(fields=['user', 'status'], name='adoption_user_status_idx'),
+            # Per-pet waitlist, oldest pending request first
+            models.Index(fields=['pet', 'status', 'request_date'], name='adoption_pet_waitlist_idx'),
+        ]
+
+
+# Reminder QuerySet
+class ReminderQuerySet(models.QuerySet):
+
+    def overdue(self, now=None):
+        """
+        Open reminders whose due_at has passed: a range scan on
+        reminder_user_due_idx when filtered by user
+        """
+        return self.filter(is_completed=False, due_at__lt=now or timezone.now())
+
+    def due_between(self, start, end):
+        """
+        Reminders with start <= due_at < end (aware datetimes)
+        """
+        return self.filter(due_at__gte=start, due_at__lt=end)
+
+    def with_bucket(self, now):
+        """
+        Annotates each reminder with 'overdue', 'today' or 'upcoming'
+        relative to the aware datetime `now`, computed in the database
+        """
+        start_of_day = timezone.make_aware(datetime.combine(timezone.localtime(now).date(), time.min))
+        end_of_day = start_of_day + timedelta(days=1)
+
+        return self.annotate(bucket=models.Case(
+            models.When(due_at__lt=now, then=models.Value('overdue')),
+            models.When(due_at__lt=end_of_day, then=models.Value('today')),
+            default=models.Value('upcoming'),
+            output_field=models.CharField(),
+        ))
+
+    def dashboard_buckets(self, now, limit):
+        """
+        At most `limit` reminders per bucket in one query: the latest
+        overdue ones and the earliest of today / upcoming. Each row also
+        carries bucket_total, the full size of its bucket.
+        """
+        partition = {'partition_by': models.F('bucket')}
+        due_order = [models.F('due_at').asc(), models.F('id').asc()]
+
+        return self.with_bucket(now).annotate(
+            position=models.Window(RowNumber(), order_by=due_order, **partition),
+            bucket_total=models.Window(models.Count('id'), **partition),
+        ).filter(
+            models.Q(bucket='overdue', position__gt=models.F('bucket_total') - limit) |
+            (~models.Q(bucket='overdue') & models.Q(position__lte=limit))
+        ).order_by('due_at', 'id')
+
+    def in_window(self, start_date, end_date):
+        """
+        Reminders that may fall due between start_date and end_date
+        (inclusive). Expand them with Reminder.occurrences().
+        """
+        return self.filter(
+            models.Q(recurrence_frequency='', reminder_date__range=(start_date, end_date)) |
+            (
+                ~models.Q(recurrence_frequency='') &
+                models.Q(reminder_date__lte=end_date) &
+                (models.Q(recurrence_until__isnull=True) | models.Q(recurrence_until__gte=start_date))
+            )
+        )
 
 
 # Reminder Model
@@ -68,6 +213,12 @@ class Reminder(models.Model):
         ('medication', 'Medication'),
         ('other', 'Other'),
     ]
+
+    RECURRENCE_FREQUENCIES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reminders')
     pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name='reminders', blank=True, null=True)
@@ -77,20 +228,63 @@ class Reminder(models.Model):
     reminder_date = models.DateField()
     reminder_time = models.TimeField()
     is_recurring = models.BooleanField(default=False)
+    recurrence_frequency = models.CharField(max_length=10, choices=RECURRENCE_FREQUENCIES, blank=True)
+    recurrence_interval = models.PositiveIntegerField(default=1, help_text="Repeat every N days / weeks / months")
+    recurrence_until = models.DateField(blank=True, null=True, help_text="Last date an occurrence may fall on")
+    recurrence_count = models.PositiveIntegerField(blank=True, null=True, help_text="Stop after this many occurrences")
     is_completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    last_notified_at = models.DateTimeField(blank=True, null=True, help_text="Due time of the last occurrence sent out")
+    # reminder_date + reminder_time as an aware datetime, kept in sync by save()
+    due_at = models.DateTimeField(editable=False)
+
+    objects = ReminderQuerySet.as_manager()
     
     def __str__(self):
         return f"{self.title} - {self.reminder_date}"
     
     class Meta:
-        ordering = ['reminder_date', 'reminder_time']
+        ordering = ['due_at']
+        indexes = [
+            # Partial: "NOT is_completed" can't be matched as an index column
+            models.Index(
+                fields=['user', 'due_at'],
+                name='reminder_user_due_idx',
+                condition=models.Q(is_completed=False),
+            ),
+            models.Index(fields=['due_at'], name='reminder_due_idx'),
+        ]
     
+    def sync_derived_fields(self):
+        """
+        Recompute is_recurring and due_at. Called by save(); bulk_create
+        callers have to call it themselves.
+        """
+        # Views assign the raw POST strings, parse them first
+        self.reminder_date = self._meta.get_field('reminder_date').to_python(self.reminder_date)
+        self.reminder_time = self._meta.get_field('reminder_time').to_python(self.reminder_time)
+
+        # is_recurring mirrors whether a rule is set
+        self.is_recurring = bool(self.recurrence_frequency)
+        self.due_at = timezone.make_aware(datetime.combine(self.reminder_date, self.reminder_time))
+
+    def save(self, *args, **kwargs):
+        self.sync_derived_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'reminder_date', 'reminder_time'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'due_at'}
+        super().save(*args, **kwargs)
+
+    def occurrences(self, start, end):
+        """
+        Occurrences due between the naive local datetimes start and end
+        """
+        return expand([self], start, end)
+
     @property
     def is_overdue(self):
-        from datetime import datetime, date, time
-        reminder_datetime = datetime.combine(self.reminder_date, self.reminder_time)
-        return reminder_datetime < datetime.now() and not self.is_completed
+        return self.due_at < timezone.now() and not self.is_completed
 
 
 # Chatbot Query Model
@@ -109,6 +303,9 @@ class ChatbotQuery(models.Model):
         ordering = ['-timestamp']
         verbose_name = "Chatbot Query"
         verbose_name_plural = "Chatbot Queries"
+        indexes = [
+            models.Index(fields=['user', 'timestamp'], name='chatbot_user_timestamp_idx'),
+        ]
 
 
 # User Profile Model (Extended User Info)
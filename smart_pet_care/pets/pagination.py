@@ -0,0 +1,87 @@
+"""
+Keyset (cursor) pagination over (added_date, id).
+
+Each page is fetched with a range filter on the last row seen instead
+of OFFSET, so deep pages cost the same as the first one.
+"""
+
+import base64
+import binascii
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.db.models import Q
+
+
+def encode_cursor(obj):
+    raw = f"{obj.added_date.isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Returns (added_date, id), or None if the cursor is not valid
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        added_date, pk = raw.rsplit("|", 1)
+        return datetime.fromisoformat(added_date), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+@dataclass
+class KeysetPage:
+    object_list: list = field(default_factory=list)
+    next_cursor: str = None
+    previous_cursor: str = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def keyset_paginate(queryset, page_size, after=None, before=None):
+    """
+    One page of queryset, newest first, starting after the `after`
+    cursor or ending before the `before` cursor
+    """
+    after, before = decode_cursor(after), decode_cursor(before)
+
+    if before:
+        added_date, pk = before
+        rows = list(
+            queryset.filter(Q(added_date__gt=added_date) | Q(added_date=added_date, pk__gt=pk))
+            .order_by("added_date", "pk")[:page_size + 1]
+        )
+        has_more = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        has_next, has_previous = True, has_more
+    else:
+        if after:
+            added_date, pk = after
+            queryset = queryset.filter(
+                Q(added_date__lt=added_date) | Q(added_date=added_date, pk__lt=pk)
+            )
+        rows = list(queryset.order_by("-added_date", "-pk")[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        has_next, has_previous = has_more, after is not None
+
+    return KeysetPage(
+        object_list=rows,
+        next_cursor=encode_cursor(rows[-1]) if rows and has_next else None,
+        previous_cursor=encode_cursor(rows[0]) if rows and has_previous else None,
+    )
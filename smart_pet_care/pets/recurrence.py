@@ -0,0 +1,109 @@
+"""
+Lazy expansion of recurring reminders.
+
+A recurring Reminder stores one row with its rule (frequency, interval,
+until / count). Occurrences are computed with dateutil.rrule only for
+the date window that is being shown and are never saved as rows.
+
+Datetimes here are naive wall-clock values in the current timezone,
+the same way reminder_date and reminder_time are stored.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+from dateutil.rrule import DAILY, MONTHLY, WEEKLY, rrule
+from django.utils import timezone
+
+FREQUENCIES = {
+    'daily': DAILY,
+    'weekly': WEEKLY,
+    'monthly': MONTHLY,
+}
+
+# Frequencies with a fixed step, which lets expansion jump straight to
+# the window instead of walking every occurrence since the start date
+FIXED_STEPS = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(weeks=1),
+}
+
+
+@dataclass(frozen=True)
+class Occurrence:
+    """
+    One concrete due time of a reminder. Unknown attributes are read
+    from the reminder, so templates can treat it like a Reminder.
+    """
+    reminder: object
+    due: datetime
+
+    @property
+    def reminder_date(self):
+        return self.due.date()
+
+    @property
+    def reminder_time(self):
+        return self.due.time()
+
+    @property
+    def due_at(self):
+        return timezone.make_aware(self.due)
+
+    def __getattr__(self, name):
+        if name.startswith('__') or name in ('reminder', 'due'):
+            raise AttributeError(name)
+        return getattr(self.reminder, name)
+
+
+def _rule(reminder, dtstart, count):
+    return rrule(
+        FREQUENCIES[reminder.recurrence_frequency],
+        dtstart=dtstart,
+        interval=reminder.recurrence_interval or 1,
+        count=count,
+    )
+
+
+def occurrence_datetimes(reminder, start, end):
+    """
+    Due datetimes of reminder with start <= due <= end
+    """
+    first = datetime.combine(reminder.reminder_date, reminder.reminder_time)
+
+    if not reminder.recurrence_frequency:
+        return [first] if start <= first <= end else []
+    if reminder.recurrence_frequency not in FREQUENCIES:
+        return []  # Saved before frequencies were validated, nothing to expand
+
+    if reminder.recurrence_until:
+        end = min(end, datetime.combine(reminder.recurrence_until, time.max))
+    if end < first:
+        return []
+
+    dtstart, count = first, reminder.recurrence_count
+    step = FIXED_STEPS.get(reminder.recurrence_frequency)
+
+    if step and start > first:
+        step = step * (reminder.recurrence_interval or 1)
+        skipped = (start - first) // step
+        dtstart = first + skipped * step
+        if count is not None:
+            count -= skipped
+            if count <= 0:
+                return []
+
+    return _rule(reminder, dtstart, count).between(start, end, inc=True)
+
+
+def expand(reminders, start, end):
+    """
+    Sorted occurrences of all reminders inside [start, end]
+    """
+    occurrences = [
+        Occurrence(reminder, due)
+        for reminder in reminders
+        for due in occurrence_datetimes(reminder, start, end)
+    ]
+    occurrences.sort(key=lambda occurrence: (occurrence.due, occurrence.reminder.pk or 0))
+    return occurrences
@@ -0,0 +1,272 @@
+"""
+Bulk import and export of reminders as CSV or iCalendar (.ics).
+
+Imports read the upload line by line, check every row with
+ReminderForm and insert the valid ones with bulk_create in chunks, so
+memory use does not grow with the file. Exports are generators over
+QuerySet.iterator() meant for StreamingHttpResponse.
+"""
+
+import csv
+import io
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from .forms import ReminderForm
+from .models import Pet, Reminder
+
+CSV_FIELDS = [
+    'title',
+    'description',
+    'reminder_type',
+    'pet',
+    'reminder_date',
+    'reminder_time',
+    'recurrence_frequency',
+    'recurrence_interval',
+    'recurrence_until',
+    'recurrence_count',
+]
+
+ICS_FREQUENCIES = {'DAILY': 'daily', 'WEEKLY': 'weekly', 'MONTHLY': 'monthly'}
+
+
+# =========================================================
+# PARSING
+# =========================================================
+
+def text_lines(uploaded_file):
+    """
+    Decoded lines of an uploaded file, read lazily
+    """
+    return io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+
+
+def parse_csv(lines):
+    """
+    Yields (line number, row dict) for every data row
+    """
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield reader.line_num, {key.strip(): (value or '').strip() for key, value in row.items() if key}
+
+
+def _unfold(lines):
+    """
+    Joins RFC 5545 continuation lines (starting with a space or tab)
+    """
+    number, current = 0, None
+    for number, line in enumerate(lines, start=1):
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and current is not None:
+            current = (current[0], current[1] + line[1:])
+            continue
+        if current is not None:
+            yield current
+        current = (number, line)
+    if current is not None:
+        yield current
+
+
+_ESCAPED = re.compile(r'\\([\\;,nN])')
+
+
+def _unescape(value):
+    # One pass, so the "n" of an escaped backslash followed by n stays text
+    return _ESCAPED.sub(lambda match: '\n' if match.group(1) in 'nN' else match.group(1), value)
+
+
+def _ics_datetime(value, params):
+    """
+    (date, time) in local time from an iCalendar DATE or DATE-TIME
+    """
+    if params.get('VALUE') == 'DATE' or len(value) == 8:
+        return datetime.strptime(value[:8], '%Y%m%d').date(), datetime.min.time()
+
+    moment = datetime.strptime(value.rstrip('Z'), '%Y%m%dT%H%M%S')
+    if value.endswith('Z'):
+        moment = timezone.localtime(moment.replace(tzinfo=dt_timezone.utc))
+    return moment.date(), moment.time().replace(tzinfo=None)
+
+
+def _ics_event_row(properties):
+    row = {
+        'title': properties.get('SUMMARY', ('', {}))[0],
+        'description': properties.get('DESCRIPTION', ('', {}))[0],
+        'reminder_type': 'other',
+        'recurrence_interval': '1',
+    }
+
+    categories = properties.get('CATEGORIES', ('', {}))[0].lower().replace(' ', '_')
+    if categories in dict(Reminder.REMINDER_TYPES):
+        row['reminder_type'] = categories
+
+    if 'DTSTART' in properties:
+        value, params = properties['DTSTART']
+        reminder_date, reminder_time = _ics_datetime(value, params)
+        row['reminder_date'] = reminder_date.isoformat()
+        row['reminder_time'] = reminder_time.strftime('%H:%M:%S')
+
+    if 'RRULE' in properties:
+        rule = dict(
+            part.split('=', 1) for part in properties['RRULE'][0].split(';') if '=' in part
+        )
+        row['recurrence_frequency'] = ICS_FREQUENCIES.get(rule.get('FREQ', ''), rule.get('FREQ', '').lower())
+        row['recurrence_interval'] = rule.get('INTERVAL', '1')
+        row['recurrence_count'] = rule.get('COUNT', '')
+        if 'UNTIL' in rule:
+            row['recurrence_until'] = _ics_datetime(rule['UNTIL'], {})[0].isoformat()
+
+    return row
+
+
+def parse_ics(lines):
+    """
+    Yields (line number, row dict) for every VEVENT
+    """
+    event, start_line = None, 0
+
+    for number, line in _unfold(lines):
+        name, _, value = line.partition(':')
+        name, *raw_params = name.split(';')
+        name = name.upper()
+
+        if name == 'BEGIN' and value.upper() == 'VEVENT':
+            event, start_line = {}, number
+        elif name == 'END' and value.upper() == 'VEVENT' and event is not None:
+            try:
+                yield start_line, _ics_event_row(event)
+            except ValueError as error:
+                yield start_line, {'_error': f'Invalid date: {error}'}
+            event = None
+        elif event is not None and name not in event:
+            params = dict(param.split('=', 1) for param in raw_params if '=' in param)
+            event[name] = (_unescape(value), params)
+
+
+# =========================================================
+# IMPORT
+# =========================================================
+
+def import_reminders(user, rows, chunk_size=None, max_errors=20):
+    """
+    Validates rows with ReminderForm and bulk inserts the valid ones.
+    Returns (number created, number rejected, first error messages).
+    """
+    chunk_size = chunk_size or settings.REMINDER_IMPORT_CHUNK_SIZE
+    user_pets = Pet.objects.filter(
+        adoption_requests__user=user,
+        adoption_requests__status='approved',
+    ).distinct()
+
+    created, rejected, errors, chunk = 0, 0, [], []
+
+    for line, row in rows:
+        if not row.get('recurrence_interval'):
+            row['recurrence_interval'] = '1'
+
+        form = ReminderForm(data=row)
+        form.fields['pet'].queryset = user_pets
+
+        if '_error' not in row and form.is_valid():
+            reminder = form.save(commit=False)
+            reminder.user = user
+            reminder.sync_derived_fields()
+            chunk.append(reminder)
+        else:
+            rejected += 1
+            if len(errors) < max_errors:
+                problems = row.get('_error') or '; '.join(
+                    f'{field}: {" ".join(messages)}' for field, messages in form.errors.items()
+                )
+                errors.append(f'Line {line}: {problems}')
+
+        if len(chunk) >= chunk_size:
+            Reminder.objects.bulk_create(chunk)
+            created += len(chunk)
+            chunk = []
+
+    if chunk:
+        Reminder.objects.bulk_create(chunk)
+        created += len(chunk)
+
+    return created, rejected, errors
+
+
+# =========================================================
+# EXPORT
+# =========================================================
+
+class _Echo:
+    """
+    File-like object whose write() hands back the value, so csv.writer
+    output can be yielded row by row
+    """
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def export_csv(queryset):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_FIELDS)
+
+    columns = [field if field != 'pet' else 'pet_id' for field in CSV_FIELDS]
+    for values in queryset.values_list(*columns).iterator(chunk_size=2000):
+        yield writer.writerow([_csv_value(value) for value in values])
+
+
+def _escape(value):
+    return (
+        value.replace('\\', '\\\\').replace(';', '\\;')
+        .replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    """
+    Splits a content line into 75 character pieces (RFC 5545)
+    """
+    pieces = [line[:75]]
+    pieces += [' ' + line[i:i + 74] for i in range(75, len(line), 74)]
+    return '\r\n'.join(pieces) + '\r\n'
+
+
+def export_ics(queryset):
+    stamp = timezone.now().strftime('%Y%m%dT%H%M%SZ')
+    yield 'BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Smart Pet Care//Reminders//EN\r\n'
+
+    for reminder in queryset.iterator(chunk_size=2000):
+        start = datetime.combine(reminder.reminder_date, reminder.reminder_time)
+        lines = [
+            'BEGIN:VEVENT',
+            f'UID:reminder-{reminder.pk}@smartpetcare',
+            f'DTSTAMP:{stamp}',
+            f'DTSTART:{start:%Y%m%dT%H%M%S}',
+            f'SUMMARY:{_escape(reminder.title)}',
+            f'CATEGORIES:{reminder.reminder_type.upper()}',
+        ]
+        if reminder.description:
+            lines.append(f'DESCRIPTION:{_escape(reminder.description)}')
+        if reminder.recurrence_frequency:
+            rule = f'FREQ={reminder.recurrence_frequency.upper()};INTERVAL={reminder.recurrence_interval}'
+            if reminder.recurrence_count:
+                rule += f';COUNT={reminder.recurrence_count}'
+            if reminder.recurrence_until:
+                rule += f';UNTIL={reminder.recurrence_until:%Y%m%d}T235959'
+            lines.append(f'RRULE:{rule}')
+        lines.append('END:VEVENT')
+
+        yield ''.join(_fold(line) for line in lines)
+
+    yield 'END:VCALENDAR\r\n'
@@ -0,0 +1,126 @@
+"""
+Resized renditions of Pet.image.
+
+Every uploaded photo gets a thumbnail, card and detail rendition in
+WebP and JPEG, stored next to the original under pets/renditions/.
+File names are derived from the original's full name, extension
+included (pets/dog.png -> pets/renditions/dog.png-card.jpg), so a new
+upload always gets fresh renditions and templates can build URLs without a
+database lookup.
+
+Renditions are generated in a background thread pool once the Pet row
+is committed (see signals.py). The backfill_renditions management
+command covers images that were uploaded before this existed.
+"""
+
+import io
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Name -> maximum width in pixels, smallest first
+RENDITIONS = {
+    'thumbnail': 320,
+    'card': 640,
+    'detail': 1280,
+}
+
+FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+    'jpg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+_executor = None
+
+
+def rendition_name(image_name, rendition, extension):
+    # Storage only keeps full names unique: dog.jpg and dog.png can both exist
+    directory, filename = posixpath.split(image_name)
+    return posixpath.join(directory, 'renditions', f'{filename}-{rendition}.{extension}')
+
+
+def rendition_names(image_name):
+    return [
+        rendition_name(image_name, rendition, extension)
+        for rendition in RENDITIONS
+        for extension in FORMATS
+    ]
+
+
+def has_renditions(image_name):
+    # The largest JPEG is written last
+    return default_storage.exists(rendition_name(image_name, 'detail', 'jpg'))
+
+
+def _flatten(image):
+    """
+    RGB copy of image, with transparency composited onto white
+    """
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def generate_renditions(image_name, force=False):
+    """
+    Write every rendition of one stored image. Returns the number of
+    files written.
+    """
+    if not force and has_renditions(image_name):
+        return 0
+
+    with default_storage.open(image_name, 'rb') as source:
+        original = _flatten(ImageOps.exif_transpose(Image.open(source)))
+
+    written = 0
+    for rendition, width in RENDITIONS.items():
+        resized = original.copy()
+        # Never upscale, only cap the width
+        resized.thumbnail((width, width * 4), Image.LANCZOS)
+
+        for extension, options in FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, **options)
+
+            name = rendition_name(image_name, rendition, extension)
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            default_storage.save(name, ContentFile(buffer.getvalue()))
+            written += 1
+
+    return written
+
+
+def _generate_safely(image_name, force=False):
+    try:
+        return generate_renditions(image_name, force=force)
+    except Exception:
+        logger.exception("Could not generate renditions for %s", image_name)
+        return 0
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PET_RENDITION_WORKERS,
+            thread_name_prefix='pet-renditions',
+        )
+    return _executor
+
+
+def schedule_renditions(image_name, force=False):
+    """
+    Generate renditions for image_name in the background worker pool
+    """
+    return _get_executor().submit(_generate_safely, image_name, force)
@@ -0,0 +1,36 @@
+from rest_framework import serializers
+
+from .models import Pet
+
+
+# ======================================
+# PET CATALOG SERIALIZER
+# ======================================
+
+class PetSerializer(serializers.ModelSerializer):
+    """
+    Pet for the JSON catalog. Pass fields=[...] to keep only some of
+    the columns (the ?fields= selector).
+    """
+
+    class Meta:
+        model = Pet
+        fields = [
+            'id',
+            'name',
+            'breed',
+            'pet_type',
+            'age',
+            'description',
+            'health_status',
+            'image',
+            'status',
+            'added_date',
+        ]
+        read_only_fields = fields
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
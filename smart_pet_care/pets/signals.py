@@ -1,6 +1,9 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
-from .models import Adoption
+from . import catalog_cache, search
+from .models import Adoption, Pet
+from .renditions import schedule_renditions
 
 
 @receiver(post_save, sender=Adoption)
@@ -13,3 +16,53 @@ def update_pet_status_on_approval(sender, instance, **kwargs):
         if pet.status != 'adopted':
             pet.status = 'adopted'
             pet.save()
+
+
+@receiver(post_save, sender=Pet)
+def generate_pet_image_renditions(sender, instance, **kwargs):
+    """
+    Resize a pet's photo in the background once the row is committed
+    """
+    if instance.image:
+        image_name = instance.image.name
+        pet_type = instance.pet_type
+
+        def refresh_catalog(future):
+            # Cached grids still point at the original upload
+            if future.result():
+                catalog_cache.invalidate(pet_type)
+
+        transaction.on_commit(
+            lambda: schedule_renditions(image_name).add_done_callback(refresh_catalog)
+        )
+
+
+@receiver(post_init, sender=Pet)
+def remember_loaded_pet_type(sender, instance, **kwargs):
+    instance._loaded_pet_type = instance.pet_type
+
+
+@receiver(post_save, sender=Pet)
+@receiver(post_delete, sender=Pet)
+def invalidate_catalog_cache(sender, instance, **kwargs):
+    """
+    Any change to a pet (including the status flip done when an
+    adoption is approved) retires the cached catalog grids of its type
+    """
+    pet_types = {instance.pet_type, instance._loaded_pet_type}
+    transaction.on_commit(lambda: catalog_cache.invalidate(*pet_types))
+    instance._loaded_pet_type = instance.pet_type
+
+
+@receiver(post_save, sender=Pet)
+def update_search_index(sender, instance, **kwargs):
+    """
+    Mirror the pet's text into the full-text index, in the same
+    transaction as the save
+    """
+    search.index_pet(instance)
+
+
+@receiver(post_delete, sender=Pet)
+def remove_from_search_index(sender, instance, **kwargs):
+    search.remove_pet(instance.pk)
@@ -0,0 +1,66 @@
+"""
+Static files with content-hashed names and precompressed copies.
+
+collectstatic writes style.<hash>.css next to style.css, as
+ManifestStaticFilesStorage does, plus style.<hash>.css.gz and, when the
+optional brotli package is installed, style.<hash>.css.br. Hashed names
+never change content, so serve_static() can cache them for a year.
+
+Before collectstatic has run (development, tests) there is no manifest
+and {% static %} falls back to the plain names.
+"""
+
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # Optional, only gzip copies are written without it
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.map', '.txt', '.html', '.xml')
+
+# Files smaller than this aren't worth a compressed copy
+MIN_COMPRESS_SIZE = 256
+
+
+def _encodings():
+    encodings = {'gz': lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encodings['br'] = lambda data: brotli.compress(data, quality=11)
+    return encodings
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+
+        encodings = _encodings()
+        for name in self.hashed_files.values():
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+
+            with self.open(name) as original:
+                data = original.read()
+            if len(data) < MIN_COMPRESS_SIZE:
+                continue
+
+            for extension, compress in encodings.items():
+                compressed = compress(data)
+                if len(compressed) >= len(data):
+                    continue
+                compressed_name = f'{name}.{extension}'
+                if self.exists(compressed_name):
+                    self.delete(compressed_name)
+                self._save(compressed_name, ContentFile(compressed))
+                yield compressed_name, compressed_name, True
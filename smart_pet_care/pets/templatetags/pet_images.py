@@ -0,0 +1,48 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+from ..renditions import FORMATS, RENDITIONS, has_renditions, rendition_name
+
+register = template.Library()
+
+MIME_TYPES = {'webp': 'image/webp', 'jpg': 'image/jpeg'}
+
+
+def _srcset(image_name, extension):
+    return ', '.join(
+        f'{default_storage.url(rendition_name(image_name, rendition, extension))} {width}w'
+        for rendition, width in RENDITIONS.items()
+    )
+
+
+@register.simple_tag
+def pet_picture(pet, rendition='card', css_class='pet-image', sizes='(max-width: 768px) 100vw, 400px'):
+    """
+    <picture> for pet.image with WebP and JPEG srcsets. Falls back to
+    the original upload until its renditions have been generated.
+    """
+    image_name = pet.image.name
+
+    if not has_renditions(image_name):
+        return format_html(
+            '<img src="{}" class="{}" alt="{}" loading="lazy">',
+            pet.image.url, css_class, pet.name,
+        )
+
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (MIME_TYPES[extension], _srcset(image_name, extension), sizes)
+            for extension in FORMATS if extension != 'jpg'
+        ),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" class="{}" alt="{}" loading="lazy"></picture>',
+        sources,
+        default_storage.url(rendition_name(image_name, rendition, 'jpg')),
+        _srcset(image_name, 'jpg'),
+        sizes,
+        css_class,
+        pet.name,
+    )
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     # Public URLs
@@ -19,9 +19,17 @@ urlpatterns = [
     # Reminder URLs
     path('reminders/', views.reminder_list, name='reminder_list'),
     path('reminder/add/', views.add_reminder, name='add_reminder'),
+    path('reminders/import/', views.import_reminders, name='import_reminders'),
+    path('reminders/export/', views.export_reminders, name='export_reminders'),
     path('reminder/edit/<int:reminder_id>/', views.edit_reminder, name='edit_reminder'),
     path('reminder/delete/<int:reminder_id>/', views.delete_reminder, name='delete_reminder'),
     
     # Chatbot URLs
     path('chatbot/', views.chatbot_view, name='chatbot'),
+    path('chatbot/batch/', views.chatbot_batch_view, name='chatbot_batch'),
+    path('chatbot/async/', views.chatbot_async_view, name='chatbot_async'),
+
+    # JSON API
+    path('api/pets/', api.pet_catalog, name='api_pet_catalog'),
+    path('api/pets/<int:pet_id>/', api.pet_detail, name='api_pet_detail'),
 ]
\ No newline at end of file
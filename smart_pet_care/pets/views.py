@@ -2,14 +2,43 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
 from django.utils import timezone
+from django.utils.safestring import mark_safe
 from django.contrib.auth.models import User
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponseNotAllowed, HttpResponseNotModified
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+from django.contrib.auth.views import redirect_to_login
+from asgiref.sync import sync_to_async
+import asyncio
+import hashlib
+import json
+import mimetypes
+import os
+import uuid
+from functools import lru_cache
+from pathlib import Path
 
 from .models import Pet, Adoption, Reminder, ChatbotQuery, UserProfile
 from .forms import UserRegisterForm, PetForm
-from datetime import datetime
-from .chatbot import get_chatbot_response
+from datetime import date, datetime, time, timedelta
+from .chatbot import get_chatbot_response, answer_messages
+from .pagination import KeysetPage, decode_cursor, keyset_paginate
+from .recurrence import expand
+from . import catalog_cache, chat_log, reminder_io, search
 
 
 
@@ -29,6 +58,58 @@ def is_admin(user):
 # PUBLIC VIEWS
 # ============================================
 
+# Only known types get a cache version, anything else is rendered live
+CATALOG_CACHE_TYPES = {value for value, label in Pet.PET_TYPES} | {catalog_cache.ALL_TYPES}
+
+
+def _catalog_type(request):
+    pet_type = request.GET.get('type')
+    return pet_type if pet_type in CATALOG_CACHE_TYPES else catalog_cache.ALL_TYPES
+
+
+@lru_cache(maxsize=None)
+def _templates_stamp():
+    """
+    Newest template mtime, so a deploy with changed markup changes ETags
+    """
+    templates = Path(__file__).resolve().parent / 'templates'
+    return max(path.stat().st_mtime_ns for path in templates.rglob('*.html'))
+
+
+def _page_etag(request, *args, **kwargs):
+    """
+    Weak ETag of a public page: the catalog version plus everything else
+    the HTML depends on (user, CSRF cookie, query string, templates and
+    static manifest). None while flash messages are queued, those pages
+    have to be rendered.
+    """
+    if len(messages.get_messages(request)):
+        return None
+
+    parts = [
+        catalog_cache.get_version(_catalog_type(request)),
+        request.user.pk,
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+        request.get_full_path(),
+        _templates_stamp(),
+        getattr(staticfiles_storage, 'manifest_hash', ''),
+    ]
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    # Weak: the CSRF token in the page is masked differently per render
+    return f'W/"{digest}"'
+
+
+def _page_last_modified(request, *args, **kwargs):
+    """
+    Last catalog change (pet added, edited, adopted or deleted)
+    """
+    if len(messages.get_messages(request)):
+        return None
+    return catalog_cache.last_changed(_catalog_type(request))
+
+
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_page_etag, last_modified_func=_page_last_modified)
 def home(request):
     """
     Home page
@@ -36,16 +117,81 @@ def home(request):
     return render(request, 'pets/home.html')
 
 
-def pet_list(request):
-    pet_type = request.GET.get('type')
+def _catalog_cursor(after, before):
+    """
+    The page the cursors select, as part of the grid cache key: None
+    for the first page, ('after' / 'before', (added_date, id)) for a
+    cursor on an existing pet, False for a made-up one, which is
+    rendered without caching so query strings can't add cache entries.
+    An invalid cursor is the first page and `before` wins over `after`,
+    as in keyset_paginate.
+    """
+    for direction, cursor in (('before', decode_cursor(before)), ('after', decode_cursor(after))):
+        if cursor:
+            added_date, pk = cursor
+            if not Pet.objects.filter(pk=pk, added_date=added_date).exists():
+                return False
+            return direction, cursor
+    return None
 
-    pets = Pet.objects.filter(status='available')
 
-    if pet_type and pet_type != 'all':
-        pets = pets.filter(pet_type=pet_type)
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_page_etag, last_modified_func=_page_last_modified)
+def pet_list(request):
+    """
+    Available pets, newest first, one keyset page at a time.
+    The rendered grid is cached per pet type (see catalog_cache.py).
+    """
+    pet_type = request.GET.get('type')
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    query = request.GET.get('q', '').strip()
+
+    if query:
+        # Ranked full-text matches, one page, never cached
+        pets = Pet.objects.filter(status='available')
+        if pet_type and pet_type != 'all':
+            pets = pets.filter(pet_type=pet_type)
+        results = list(search.search(pets, query, settings.PET_SEARCH_MAX_RESULTS))
+
+        grid = render_to_string('pets/pet_grid.html', {
+            'pets': results,
+            'page': KeysetPage(object_list=results),
+            'pet_type': pet_type,
+            'user': request.user,
+        })
+        return render(request, 'pets/pet_list.html', {
+            'catalog_grid': mark_safe(grid),
+            'query': query,
+        })
+
+    def render_grid():
+        pets = Pet.objects.filter(status='available')
+
+        if pet_type and pet_type != 'all':
+            pets = pets.filter(pet_type=pet_type)
+
+        page = keyset_paginate(pets, settings.PET_LIST_PAGE_SIZE, after=after, before=before)
+
+        return render_to_string('pets/pet_grid.html', {
+            'pets': page,
+            'page': page,
+            'pet_type': pet_type,
+            'user': request.user,
+        })
+
+    cursor = _catalog_cursor(after, before)
+    if (not pet_type or pet_type in CATALOG_CACHE_TYPES) and cursor is not False:
+        grid = catalog_cache.get_or_render(
+            pet_type,
+            (cursor, request.user.is_authenticated),
+            render_grid,
+        )
+    else:
+        grid = render_grid()
 
     return render(request, 'pets/pet_list.html', {
-        'pets': pets
+        'catalog_grid': mark_safe(grid),
     })
 
 
@@ -114,57 +260,70 @@ def logout_view(request):
 # USER DASHBOARD
 # ============================================
 
-from datetime import datetime
-from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth.decorators import login_required
-from django.contrib import messages
-
-from .models import Pet, Adoption, Reminder
+def _count(queryset):
+    """
+    COUNT(*) of queryset as a scalar subquery, for one-query stats
+    """
+    return Coalesce(Subquery(
+        queryset.order_by().values('user').annotate(total=Count('pk')).values('total')
+    ), 0)
 
 
 @login_required
 def user_dashboard(request):
     # All adoption requests of the user
-    adoptions = Adoption.objects.filter(user=request.user)
-
-    # Active (not completed) reminders
-    reminders = Reminder.objects.filter(
-        user=request.user,
-        is_completed=False
-    )
-
-    now = datetime.now()
-
-    overdue_reminders = []
-    today_reminders = []
-    upcoming_reminders = []
+    adoptions = Adoption.objects.filter(user=request.user).select_related('pet').with_waitlist_position()
 
-    for reminder in reminders:
-        reminder_datetime = datetime.combine(
-            reminder.reminder_date,
-            reminder.reminder_time
-        )
+    # All stats in a single query
+    stats = User.objects.filter(pk=request.user.pk).annotate(
+        adopted_pets_count=_count(Adoption.objects.filter(user=OuterRef('pk'), status='approved')),
+        pending_adoptions_count=_count(Adoption.objects.filter(user=OuterRef('pk'), status='pending')),
+        active_reminders_count=_count(Reminder.objects.filter(user=OuterRef('pk'), is_completed=False)),
+    ).values('adopted_pets_count', 'pending_adoptions_count', 'active_reminders_count').get()
 
-        if reminder_datetime < now:
-            overdue_reminders.append(reminder)
-        elif reminder_datetime.date() == now.date():
-            today_reminders.append(reminder)
+    # Active (not completed) reminders
+    now = timezone.now()
+    limit = settings.DASHBOARD_REMINDERS_PER_BUCKET
+    buckets = {'overdue': [], 'today': [], 'upcoming': []}
+    reminders = Reminder.objects.filter(user=request.user, is_completed=False)
+
+    # One-off reminders: bucketed and limited in the database
+    for reminder in reminders.filter(recurrence_frequency='').dashboard_buckets(now, limit):
+        buckets[reminder.bucket].append(reminder)
+
+    # Recurring reminders: only their occurrences in the coming days
+    today = timezone.localdate(now)
+    window_end = today + timedelta(days=settings.DASHBOARD_RECURRENCE_DAYS)
+    recurring = reminders.exclude(recurrence_frequency='').in_window(today, window_end)
+
+    for occurrence in expand(
+        recurring,
+        datetime.combine(today, time.min),
+        datetime.combine(window_end, time.max),
+    ):
+        if occurrence.due_at < now:
+            buckets['overdue'].append(occurrence)
+        elif occurrence.reminder_date == today:
+            buckets['today'].append(occurrence)
         else:
-            upcoming_reminders.append(reminder)
+            buckets['upcoming'].append(occurrence)
+
+    for name, items in buckets.items():
+        items.sort(key=lambda r: r.due_at)
+        # Latest overdue, earliest today / upcoming
+        buckets[name] = items[-limit:] if name == 'overdue' else items[:limit]
 
     context = {
         # Adoption data
         'adoptions': adoptions,
-        'adopted_pets_count': adoptions.filter(status='approved').count(),
-        'pending_adoptions_count': adoptions.filter(status='pending').count(),
 
         # Reminder intelligence
-        'overdue_reminders': overdue_reminders,
-        'today_reminders': today_reminders,
-        'upcoming_reminders': upcoming_reminders,
+        'overdue_reminders': buckets['overdue'],
+        'today_reminders': buckets['today'],
+        'upcoming_reminders': buckets['upcoming'],
 
         # Stats
-        'active_reminders_count': reminders.count(),
+        **stats,
     }
 
     return render(request, 'pets/user_dashboard.html', context)
@@ -172,22 +331,29 @@ def user_dashboard(request):
 
 @login_required
 def adopt_pet(request, pet_id):
+    """
+    Join the pet's adoption waitlist
+    - unique_together (user, pet) is the duplicate check, a concurrent
+      double submit loses the INSERT instead of racing an exists()
+    - Requests are approved in first-come order (see AdoptionQuerySet)
+    """
     pet = get_object_or_404(Pet, id=pet_id)
 
     if pet.status != 'available':
         messages.error(request, 'This pet is not available for adoption.')
         return redirect('pet_list')
 
-    if Adoption.objects.filter(user=request.user, pet=pet).exists():
+    try:
+        with transaction.atomic():
+            Adoption.objects.create(
+                user=request.user,
+                pet=pet,
+                status='pending'
+            )
+    except IntegrityError:
         messages.warning(request, 'You have already requested this pet.')
         return redirect('user_dashboard')
 
-    Adoption.objects.create(
-        user=request.user,
-        pet=pet,
-        status='pending'
-    )
-
     messages.success(request, 'Adoption request submitted successfully.')
     return redirect('user_dashboard')
 
@@ -212,13 +378,82 @@ def cancel_adoption(request, adoption_id):
 # REMINDERS (IN-APP ONLY)
 # ============================================
 
+def _recurrence_fields(post):
+    """
+    Recurrence rule from the reminder form. Ticking "recurring"
+    without picking a frequency means daily. Raises ValueError for an
+    unknown frequency or end date.
+    """
+    if post.get('is_recurring') != 'on':
+        return {
+            'recurrence_frequency': '',
+            'recurrence_interval': 1,
+            'recurrence_until': None,
+            'recurrence_count': None,
+        }
+
+    frequency = post.get('recurrence_frequency') or 'daily'
+    if frequency not in dict(Reminder.RECURRENCE_FREQUENCIES):
+        raise ValueError('Pick how often the reminder repeats')
+
+    until = post.get('recurrence_until')
+    try:
+        until = date.fromisoformat(until) if until else None
+    except ValueError:
+        raise ValueError('Enter the last date of the reminder as YYYY-MM-DD')
+
+    return {
+        'recurrence_frequency': frequency,
+        'recurrence_interval': _positive_int(post.get('recurrence_interval')) or 1,
+        'recurrence_until': until,
+        'recurrence_count': _positive_int(post.get('recurrence_count')),
+    }
+
+
+def _positive_int(value):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+def _parse_date(value, default):
+    try:
+        return date.fromisoformat(value) if value else default
+    except ValueError:
+        return default
+
+
 @login_required
 def reminder_list(request):
     """
-    List reminders
+    List reminder occurrences inside a date window
+    - ?start=YYYY-MM-DD&end=YYYY-MM-DD, defaults to the next
+      REMINDER_LIST_DAYS days, at most REMINDER_LIST_MAX_DAYS
+    - Recurring reminders are expanded, never stored per occurrence
     """
-    reminders = Reminder.objects.filter(user=request.user)
-    return render(request, 'pets/reminder_list.html', {'reminders': reminders})
+    today = timezone.localdate()
+    start = _parse_date(request.GET.get('start'), today)
+    default_end = start + timedelta(days=settings.REMINDER_LIST_DAYS)
+    end = _parse_date(request.GET.get('end'), default_end)
+    if end < start:
+        end = default_end
+    # Every day of the window can add one row per daily reminder
+    end = min(end, start + timedelta(days=settings.REMINDER_LIST_MAX_DAYS))
+
+    reminders = Reminder.objects.filter(user=request.user).in_window(start, end)
+    occurrences = expand(
+        reminders,
+        datetime.combine(start, time.min),
+        datetime.combine(end, time.max),
+    )
+
+    return render(request, 'pets/reminder_list.html', {
+        'reminders': occurrences,
+        'start': start,
+        'end': end,
+    })
 
 
 @login_required
@@ -232,6 +467,12 @@ def add_reminder(request):
     if request.method == 'POST':
         pet_id = request.POST.get('pet')
 
+        try:
+            recurrence = _recurrence_fields(request.POST)
+        except ValueError as error:
+            messages.error(request, str(error))
+            return redirect('add_reminder')
+
         Reminder.objects.create(
             user=request.user,
             pet_id=pet_id if pet_id else None,
@@ -240,14 +481,15 @@ def add_reminder(request):
             reminder_type=request.POST.get('reminder_type'),
             reminder_date=request.POST.get('reminder_date'),
             reminder_time=request.POST.get('reminder_time'),
-            is_recurring=request.POST.get('is_recurring') == 'on'
+            **recurrence
         )
 
         messages.success(request, 'Reminder added successfully')
         return redirect('user_dashboard')
 
     return render(request, 'pets/add_reminder.html', {
-        'user_pets': user_pets
+        'user_pets': user_pets,
+        'frequencies': Reminder.RECURRENCE_FREQUENCIES,
     })
 
 @login_required
@@ -258,18 +500,82 @@ def edit_reminder(request, reminder_id):
     reminder = get_object_or_404(Reminder, id=reminder_id, user=request.user)
 
     if request.method == 'POST':
+        try:
+            recurrence = _recurrence_fields(request.POST)
+        except ValueError as error:
+            messages.error(request, str(error))
+            return redirect('edit_reminder', reminder_id=reminder.id)
+
         reminder.title = request.POST.get('title')
         reminder.description = request.POST.get('description')
         reminder.reminder_type = request.POST.get('reminder_type')
         reminder.reminder_date = request.POST.get('reminder_date')
         reminder.reminder_time = request.POST.get('reminder_time')
-        reminder.is_recurring = request.POST.get('is_recurring') == 'on'
+        for field, value in recurrence.items():
+            setattr(reminder, field, value)
         reminder.save()
 
         messages.success(request, 'Reminder updated successfully')
         return redirect('user_dashboard')
 
-    return render(request, 'pets/edit_reminder.html', {'reminder': reminder})
+    return render(request, 'pets/edit_reminder.html', {
+        'reminder': reminder,
+        'frequencies': Reminder.RECURRENCE_FREQUENCIES,
+    })
+
+
+@login_required
+def import_reminders(request):
+    """
+    Bulk import reminders from a CSV or iCalendar (.ics) upload
+    - The file is parsed as a stream and rows go through ReminderForm
+    - Valid rows are inserted in chunks, invalid ones are reported
+    - All in one transaction: a file that can't be read imports nothing
+    """
+    if request.method == 'POST' and request.FILES.get('file'):
+        upload = request.FILES['file']
+        lines = reminder_io.text_lines(upload)
+        if upload.name.lower().endswith('.ics'):
+            rows = reminder_io.parse_ics(lines)
+        else:
+            rows = reminder_io.parse_csv(lines)
+
+        try:
+            # Rows are read lazily, a bad line may come after chunks were inserted
+            with transaction.atomic():
+                created, rejected, errors = reminder_io.import_reminders(request.user, rows)
+        except (UnicodeDecodeError, ValueError):
+            messages.error(request, 'Could not read the file, expected UTF-8 CSV or iCalendar. Nothing was imported.')
+            return redirect('import_reminders')
+
+        messages.success(request, f'Imported {created} reminders')
+        if rejected:
+            messages.error(request, f'Skipped {rejected} invalid rows')
+            for error in errors:
+                messages.error(request, error)
+        return redirect('reminder_list')
+
+    return render(request, 'pets/reminder_import.html', {
+        'columns': reminder_io.CSV_FIELDS,
+    })
+
+
+@login_required
+def export_reminders(request):
+    """
+    Download all reminders of the user
+    - ?format=csv (default) or ?format=ics
+    - Rows are streamed, the queryset is never held in memory
+    """
+    reminders = Reminder.objects.filter(user=request.user).order_by('pk')
+
+    if request.GET.get('format') == 'ics':
+        response = StreamingHttpResponse(reminder_io.export_ics(reminders), content_type='text/calendar')
+        response['Content-Disposition'] = 'attachment; filename="reminders.ics"'
+    else:
+        response = StreamingHttpResponse(reminder_io.export_csv(reminders), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="reminders.csv"'
+    return response
 
 
 @login_required
@@ -304,30 +610,44 @@ def chatbot_response_logic(message):
     return 'I am here to help with pet care questions.'
 
 
+CHAT_SESSION_KEY = 'chatbot_session_id'
+
+
+def _chat_session_id(request, new=False):
+    """
+    Id of the current chat conversation, kept in the Django session
+    """
+    if new or CHAT_SESSION_KEY not in request.session:
+        request.session[CHAT_SESSION_KEY] = uuid.uuid4().hex
+    return request.session[CHAT_SESSION_KEY]
+
+
 @login_required
 def chatbot_view(request):
     """
     Chatbot page
-    - Clears old chats when page is opened
-    - Saves new chats during conversation
+    - Starts a new conversation when page is opened
+    - Saves new chats under the conversation's session_id
+    - Old conversations are removed by the prune_chat_history command
     """
 
-    # 👉 CLEAR OLD CHAT WHEN PAGE IS OPENED
+    # 👉 NEW CONVERSATION WHEN PAGE IS OPENED
     if request.method == "GET":
-        ChatbotQuery.objects.filter(user=request.user).delete()
-        chat_history = []
+        _chat_session_id(request, new=True)
 
     # 👉 HANDLE CHAT MESSAGE
     if request.method == "POST":
         message = request.POST.get("message")
 
         if message:
-            response = get_chatbot_response(message)
+            session_id = _chat_session_id(request)
+            response = get_chatbot_response(message, session_id)
 
-            ChatbotQuery.objects.create(
+            chat_log.log_chat(
                 user=request.user,
                 query=message,
-                response=response
+                response=response,
+                session_id=session_id
             )
 
             return JsonResponse({"response": response})
@@ -337,3 +657,166 @@ def chatbot_view(request):
     })
 
 
+@login_required
+@require_POST
+def chatbot_batch_view(request):
+    """
+    Bulk classification endpoint
+    - Body: {"messages": ["...", ...]}
+    - Classifies the whole batch in one pass
+    - Saves all chats with a single bulk insert
+    """
+    try:
+        payload = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({"error": "Request body must be valid JSON."}, status=400)
+
+    user_messages = payload.get("messages") if isinstance(payload, dict) else None
+
+    if not isinstance(user_messages, list) or not all(
+        isinstance(message, str) and message for message in user_messages
+    ):
+        return JsonResponse({"error": "'messages' must be a list of non-empty strings."}, status=400)
+
+    if len(user_messages) > settings.CHATBOT_BATCH_MAX_MESSAGES:
+        return JsonResponse({
+            "error": f"A batch can hold at most {settings.CHATBOT_BATCH_MAX_MESSAGES} messages."
+        }, status=400)
+
+    answers = answer_messages(user_messages)
+    session_id = _chat_session_id(request)
+
+    chat_log.log_chats([
+        ChatbotQuery(user=request.user, query=message, response=response, session_id=session_id)
+        for message, (response, pet_type, intent) in zip(user_messages, answers)
+    ])
+
+    return JsonResponse({
+        "results": [
+            {"response": response, "intent": intent, "pet_type": pet_type}
+            for response, pet_type, intent in answers
+        ]
+    })
+
+
+# ============================================
+# CHATBOT (ASYNC, FOR ASGI DEPLOYMENTS)
+# ============================================
+
+# Strong references so pending writes are not garbage collected
+_background_tasks = set()
+
+
+def _run_in_background(coroutine):
+    task = asyncio.ensure_future(coroutine)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def wait_for_background_tasks():
+    """
+    Wait until every scheduled chat write has finished
+    """
+    while _background_tasks:
+        await asyncio.gather(*list(_background_tasks))
+
+
+def _chat_user_and_session(request):
+    # Both read the database lazily, so this runs in a worker thread
+    if not request.user.is_authenticated:
+        return None, None
+    return request.user, _chat_session_id(request)
+
+
+async def chatbot_async_view(request):
+    """
+    Async chatbot endpoint
+    - Rule matching runs inline on the event loop
+    - The chat goes to the write-behind log, or to a background
+      task when that is switched off, so the reply never waits
+      on the database write
+    """
+    user, session_id = await sync_to_async(_chat_user_and_session)(request)
+    if user is None:
+        return redirect_to_login(request.get_full_path())
+
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    message = request.POST.get("message")
+    if not message:
+        return JsonResponse({"error": "'message' is required."}, status=400)
+
+    response = get_chatbot_response(message, session_id)
+
+    if settings.CHATBOT_LOG_WRITE_BEHIND:
+        # Only a queue put, the flusher thread does the insert
+        chat_log.log_chat(user=user, query=message, response=response, session_id=session_id)
+        return JsonResponse({"response": response})
+
+    save = ChatbotQuery.objects.acreate(
+        user=user, query=message, response=response, session_id=session_id
+    )
+
+    if isinstance(request, ASGIRequest):
+        _run_in_background(save)
+    else:
+        # Under WSGI the event loop ends with the request and would
+        # cancel the task, so save before replying
+        await save
+
+    return JsonResponse({"response": response})
+
+
+# ============================================
+# STATIC FILES
+# ============================================
+
+STATIC_ENCODINGS = [('br', 'br'), ('gzip', 'gz')]
+
+
+@lru_cache(maxsize=4)
+def _hashed_static_names(manifest_hash):
+    """
+    Every content-hashed name in the manifest, built once per manifest
+    """
+    return frozenset(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+
+def serve_static(request, path):
+    """
+    Files from STATIC_ROOT when no web server sits in front of Django
+    - Sends the .br / .gz copy written by collectstatic if accepted
+    - Content-hashed names are cached for a year, others revalidate
+    """
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    accepted = {part.split(';')[0].strip() for part in request.headers.get('Accept-Encoding', '').split(',')}
+    chosen, encoding = full_path, None
+    for name, extension in STATIC_ENCODINGS:
+        if name in accepted and os.path.isfile(f'{full_path}.{extension}'):
+            chosen, encoding = f'{full_path}.{extension}', name
+            break
+
+    modified = os.stat(full_path).st_mtime
+    if not was_modified_since(request.headers.get('If-Modified-Since'), modified):
+        return HttpResponseNotModified()
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    response = FileResponse(open(chosen, 'rb'), content_type=content_type, filename=os.path.basename(full_path))
+    response['Last-Modified'] = http_date(modified)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ['Accept-Encoding'])
+
+    if path in _hashed_static_names(getattr(staticfiles_storage, 'manifest_hash', '')):
+        response['Cache-Control'] = f'public, max-age={settings.STATIC_HASHED_MAX_AGE}, immutable'
+    else:
+        response['Cache-Control'] = 'public, no-cache'
+    return response
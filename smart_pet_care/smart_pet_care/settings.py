@@ -38,12 +38,15 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
 
+    'rest_framework',
+
     'pets',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'pets.middleware.SlidingSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -78,6 +81,20 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # A file, not shared-cache memory, so threaded tests see real locking
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Catalog invalidation is only seen by other processes through a shared
+# backend (Redis / Memcached) - switch to one when running several workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
@@ -119,6 +136,13 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic writes content-hashed names plus .gz / .br copies
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'pets.storage.CompressedManifestStaticFilesStorage'},
+}
+STATIC_HASHED_MAX_AGE = 31536000  # Seconds browsers keep hashed static files (1 year)
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
@@ -144,19 +168,81 @@ MESSAGE_TAGS = {
 
 # Email configuration (for password reset - optional)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'Smart Pet Care <noreply@smartpetcare.local>'
+
+# Reminder notifications (python manage.py dispatch_reminders)
+REMINDER_DISPATCH_POLL_SECONDS = 30  # How often edited / new reminders are picked up
+REMINDER_DISPATCH_HORIZON_HOURS = 24  # Reminders due within this window are kept in memory
+REMINDER_DISPATCH_CATCHUP_HOURS = 24  # Missed reminders older than this are not sent
+REMINDER_DISPATCH_BATCH_SIZE = 100  # Emails sent per connection
 
 # Security settings (for production, change these)
 DEBUG = True
 ALLOWED_HOSTS = ['*']
 
 # Session settings
+# Expiry slides without a write per request, see pets/middleware.py.
+# cached_db also saves the read per request, but only with a shared
+# cache backend: the check in pets/checks.py rejects it on LocMemCache.
+SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 SESSION_COOKIE_AGE = 86400  # 24 hours
-SESSION_SAVE_EVERY_REQUEST = True
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_SECONDS = 3600  # An unchanged session is re-saved at most this often
 
 # CSRF settings
 CSRF_COOKIE_SECURE = False  # Set to True in production with HTTPS
 SESSION_COOKIE_SECURE = False  # Set to True in production with HTTPS
 
+# Pet catalog settings
+PET_LIST_PAGE_SIZE = 12  # Pets per page on /pets/
+PET_SEARCH_MAX_RESULTS = 60  # Ranked matches shown for /pets/?q=
+CATALOG_CACHE_TIMEOUT = 3600  # Seconds a rendered catalog grid is kept
+
+# Catalog API (/api/pets/), read-only and public
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.AllowAny'],
+    'UNAUTHENTICATED_USER': None,
+}
+API_PAGE_SIZE = 20  # Pets per page when ?page_size= is not given
+API_MAX_PAGE_SIZE = 100  # Upper bound for ?page_size=
+
+# Dashboard settings
+DASHBOARD_REMINDERS_PER_BUCKET = 10  # Overdue / today / upcoming reminders shown
+DASHBOARD_RECURRENCE_DAYS = 7  # Days ahead recurring reminders are expanded for
+REMINDER_LIST_DAYS = 30  # Default window of /reminders/
+REMINDER_LIST_MAX_DAYS = 366  # Longest window /reminders/ expands
+REMINDER_IMPORT_CHUNK_SIZE = 500  # Rows per bulk insert when importing reminders
+
+# Chatbot settings
+CHATBOT_BATCH_MAX_MESSAGES = 1000  # Messages accepted by /chatbot/batch/ per request
+CHATBOT_CLASSIFY_CACHE_SIZE = 4096  # Normalized messages whose classification is kept (LRU)
+
+# Conversation context, in process memory (see pets/chat_context.py)
+CHATBOT_CONTEXT_TURNS = 5  # Recent turns remembered per conversation
+CHATBOT_CONTEXT_TTL = 1800  # Seconds an idle conversation is remembered
+CHATBOT_CONTEXT_MAX_SESSIONS = 10000  # Conversations held, least recently active dropped first
+
+# Chatbot knowledge base (see pets/chatbot.py)
+CHATBOT_INTENTS_FILE = BASE_DIR / 'pets' / 'data' / 'chatbot_intents.json'
+CHATBOT_INTENTS_RELOAD_SECONDS = 5  # How often workers look for edits, 0 = only at start
+# Built matchers are cached here, created private to the app's user
+CHATBOT_MATCHER_CACHE_DIR = BASE_DIR / 'cache' / 'chatbot'
+
+# Chat logs are saved by a background thread in bulk (see pets/chat_log.py)
+CHATBOT_LOG_WRITE_BEHIND = True  # False = save each chat before replying
+CHATBOT_LOG_BATCH_SIZE = 100  # Rows per bulk insert
+CHATBOT_LOG_FLUSH_INTERVAL = 1.0  # Seconds a row may wait before it is saved
+CHATBOT_LOG_MAX_QUEUE = 10000  # Rows held in memory, extra rows are dropped
+
+# Chat history retention (python manage.py prune_chat_history)
+CHATBOT_HISTORY_RETENTION_DAYS = 30
+CHATBOT_PRUNE_BATCH_SIZE = 500  # Rows deleted per chunk
+
+# Pet photo renditions (see pets/renditions.py)
+PET_RENDITION_WORKERS = 2  # Background threads resizing uploads
+
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
\ No newline at end of file
@@ -15,10 +15,14 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+import re
+
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 
+from pets.views import serve_static
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('pets.urls')),  # Include pets URLs
@@ -27,4 +31,9 @@ urlpatterns = [
 # Serve media files in development
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
+    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+else:
+    # Collected, hashed and precompressed files (see pets/storage.py)
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % re.escape(settings.STATIC_URL.lstrip('/')), serve_static),
+    ]
\ No newline at end of file